@@ -8,7 +8,6 @@ from django.core.management.color import no_style, color_style
 from core.plugins.manager import get_plugin_manager
 from core.plugins.documentation import DocumentationGenerator
 from pathlib import Path
-import json
 
 
 class Command(BaseCommand):
@@ -68,8 +67,8 @@ class Command(BaseCommand):
             doc = DocumentationGenerator.generate_all_plugins_doc(manager)
         
         if output_format == 'both' or output_format == 'json':
-            doc_json = DocumentationGenerator.generate_capabilities_json(manager)
-            json_doc = json.dumps(doc_json, indent=2, ensure_ascii=False)
+            payload = DocumentationGenerator.generate_capabilities_payload(manager)
+            json_doc = DocumentationGenerator.serialize(payload, indent=True).decode('utf-8')
         else:
             json_doc = None
         
@@ -6,12 +6,20 @@
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Any, Sequence
 from enum import Enum
 from datetime import datetime
+import asyncio
 import logging
 
+try:  # pragma: no cover - 可选依赖，仅 CandleBatch.to_numpy 使用
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,7 +89,7 @@ class Granularity:
         return bar in cls.GRANULARITIES
     
     @classmethod
-    def validate_list(cls, granularities: List[str]) -> tuple:
+    def validate_list(cls, granularities: Sequence[str]) -> tuple:
         """验证粒度列表，返回 (是否全部有效, 无效的粒度列表)"""
         invalid = [g for g in granularities if g not in cls.GRANULARITIES]
         return len(invalid) == 0, invalid
@@ -92,7 +100,7 @@ class Granularity:
         return cls.GRANULARITIES.get(bar)
     
     @classmethod
-    def find_closest_supported(cls, requested: str, supported: List[str]) -> Optional[str]:
+    def find_closest_supported(cls, requested: str, supported: Sequence[str]) -> Optional[str]:
         """找到最接近的支持粒度"""
         if requested in supported:
             return requested
@@ -117,13 +125,13 @@ class Granularity:
         return None
 
 
-@dataclass
+@dataclass(frozen=True)
 class Capability:
-    """数据源能力描述"""
+    """数据源能力描述（不可变，插件可在模块级构建一次后共享）"""
     
     # K线数据相关
     supports_candlesticks: bool = False
-    candlestick_granularities: List[str] = field(default_factory=list)  # 支持的粒度
+    candlestick_granularities: Sequence[str] = ()  # 支持的粒度
     candlestick_limit: int = 100  # 单次请求最大条数
     candlestick_max_history_days: Optional[int] = None  # 历史数据最多回溯多少天
     
@@ -132,9 +140,9 @@ class Capability:
     ticker_update_frequency: Optional[int] = None  # 更新频率（秒）
     
     # 交易对相关
-    supported_symbols: List[str] = field(default_factory=list)
+    supported_symbols: Sequence[str] = ()
     symbol_format: str = "BASE-QUOTE"  # 如 "BTC-USDT" 或 "BTCUSDT"
-    symbol_modes: List[str] = field(default_factory=lambda: [SymbolMode.SPOT.value])
+    symbol_modes: Sequence[str] = (SymbolMode.SPOT.value,)
     
     # 其他特性
     requires_api_key: bool = False
@@ -152,21 +160,21 @@ class Capability:
     funding_rate_interval_hours: Optional[int] = None
     funding_rate_quote_currency: Optional[str] = None
     supports_contract_basis: bool = False
-    contract_basis_types: List[str] = field(default_factory=list)
-    contract_basis_tenors: List[str] = field(default_factory=list)
+    contract_basis_types: Sequence[str] = ()
+    contract_basis_tenors: Sequence[str] = ()
     
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
         return {
             'supports_candlesticks': self.supports_candlesticks,
-            'candlestick_granularities': self.candlestick_granularities,
+            'candlestick_granularities': list(self.candlestick_granularities),
             'candlestick_limit': self.candlestick_limit,
             'candlestick_max_history_days': self.candlestick_max_history_days,
             'supports_ticker': self.supports_ticker,
             'ticker_update_frequency': self.ticker_update_frequency,
-            'supported_symbols': self.supported_symbols,
+            'supported_symbols': list(self.supported_symbols),
             'symbol_format': self.symbol_format,
-            'symbol_modes': self.symbol_modes,
+            'symbol_modes': list(self.symbol_modes),
             'requires_api_key': self.requires_api_key,
             'requires_authentication': self.requires_authentication,
             'requires_proxy': self.requires_proxy,
@@ -178,27 +186,24 @@ class Capability:
             'funding_rate_interval_hours': self.funding_rate_interval_hours,
             'funding_rate_quote_currency': self.funding_rate_quote_currency,
             'supports_contract_basis': self.supports_contract_basis,
-            'contract_basis_types': self.contract_basis_types,
-            'contract_basis_tenors': self.contract_basis_tenors,
+            'contract_basis_types': list(self.contract_basis_types),
+            'contract_basis_tenors': list(self.contract_basis_tenors),
         }
 
     def __post_init__(self) -> None:
-        if not self.symbol_modes:
-            self.symbol_modes = [SymbolMode.SPOT.value]
+        modes = self.symbol_modes or (SymbolMode.SPOT.value,)
         normalized = []
-        for mode in self.symbol_modes:
+        for mode in modes:
             normalized_mode = (mode or SymbolMode.SPOT.value).lower()
-            normalized.append(normalized_mode)
-        seen: List[str] = []
-        for mode in normalized:
-            if mode not in seen:
-                seen.append(mode)
-        self.symbol_modes = seen
+            if normalized_mode not in normalized:
+                normalized.append(normalized_mode)
+        # 冻结的 dataclass 只能在 __post_init__ 中通过 object.__setattr__ 赋值
+        object.__setattr__(self, 'symbol_modes', tuple(normalized))
 
 
-@dataclass
+@dataclass(frozen=True)
 class DataSourceMetadata:
-    """数据源元数据"""
+    """数据源元数据（不可变）"""
     
     name: str  # 唯一标识符，如 "okx", "binance", "coinbase"
     display_name: str  # 显示名称，如 "OKX 交易所"
@@ -235,9 +240,12 @@ class DataSourceMetadata:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class CandleData:
-    """K线数据"""
+    """K线数据
+
+    使用 __slots__：K线数据会被大量创建和缓存，省去每个实例的 __dict__。
+    """
     time: int  # Unix 时间戳（秒）
     open: float
     high: float
@@ -258,6 +266,72 @@ class CandleData:
 
 
 @dataclass
+class CandleBatch:
+    """列式 K线数据
+    
+    每个字段是一段连续内存（array.array），支持缓冲区协议，
+    下游可通过 numpy.frombuffer 等方式零拷贝使用。
+    """
+    time: array = field(default_factory=lambda: array('q'))  # Unix 时间戳（秒）
+    open: array = field(default_factory=lambda: array('d'))
+    high: array = field(default_factory=lambda: array('d'))
+    low: array = field(default_factory=lambda: array('d'))
+    close: array = field(default_factory=lambda: array('d'))
+    volume: array = field(default_factory=lambda: array('d'))
+    
+    def __len__(self) -> int:
+        return len(self.time)
+    
+    @classmethod
+    def from_candles(cls, candles: List[CandleData]) -> "CandleBatch":
+        """由 K线数据列表构建列式数据"""
+        return cls(
+            time=array('q', [c.time for c in candles]),
+            open=array('d', [c.open for c in candles]),
+            high=array('d', [c.high for c in candles]),
+            low=array('d', [c.low for c in candles]),
+            close=array('d', [c.close for c in candles]),
+            volume=array('d', [c.volume for c in candles]),
+        )
+    
+    def to_candles(self) -> List[CandleData]:
+        """转换回 K线数据列表"""
+        return [
+            CandleData(t, o, h, l, c, v)
+            for t, o, h, l, c, v in zip(
+                self.time, self.open, self.high, self.low, self.close, self.volume
+            )
+        ]
+    
+    def to_numpy(self) -> Dict[str, Any]:
+        """零拷贝转换为 numpy 数组字典（需安装 numpy）
+        
+        返回的数组与本对象共享内存，修改会相互影响。
+        """
+        if np is None:
+            raise RuntimeError("CandleBatch.to_numpy 需要安装 numpy")
+        return {
+            'time': np.frombuffer(self.time, dtype=np.int64),
+            'open': np.frombuffer(self.open, dtype=np.float64),
+            'high': np.frombuffer(self.high, dtype=np.float64),
+            'low': np.frombuffer(self.low, dtype=np.float64),
+            'close': np.frombuffer(self.close, dtype=np.float64),
+            'volume': np.frombuffer(self.volume, dtype=np.float64),
+        }
+    
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """转换为字典（列名到数值列表）"""
+        return {
+            'time': self.time.tolist(),
+            'open': self.open.tolist(),
+            'high': self.high.tolist(),
+            'low': self.low.tolist(),
+            'close': self.close.tolist(),
+            'volume': self.volume.tolist(),
+        }
+
+
+@dataclass(slots=True)
 class TickerData:
     """行情数据"""
     inst_id: str  # 交易对
@@ -285,7 +359,63 @@ class TickerData:
         }
 
 
+# TickerBatch 的数值列，缺失值（None）以 NaN 存放
+_TICKER_COLUMNS = (
+    'last', 'bid', 'ask', 'high_24h', 'low_24h',
+    'change_24h', 'change_24h_pct', 'volume_24h',
+)
+
+
 @dataclass
+class TickerBatch:
+    """列式行情数据
+    
+    inst_ids 为交易对列表，其余字段为等长的 float64 数组（array.array），
+    缺失值记为 NaN，可通过 to_numpy 零拷贝转换后做向量化计算。
+    """
+    inst_ids: List[str] = field(default_factory=list)
+    last: array = field(default_factory=lambda: array('d'))
+    bid: array = field(default_factory=lambda: array('d'))
+    ask: array = field(default_factory=lambda: array('d'))
+    high_24h: array = field(default_factory=lambda: array('d'))
+    low_24h: array = field(default_factory=lambda: array('d'))
+    change_24h: array = field(default_factory=lambda: array('d'))
+    change_24h_pct: array = field(default_factory=lambda: array('d'))
+    volume_24h: array = field(default_factory=lambda: array('d'))
+    
+    def __len__(self) -> int:
+        return len(self.inst_ids)
+    
+    @classmethod
+    def from_tickers(cls, tickers: List[TickerData]) -> "TickerBatch":
+        """由行情数据列表构建列式数据"""
+        nan = float('nan')
+        return cls(
+            inst_ids=[t.inst_id for t in tickers],
+            **{
+                name: array('d', [nan if v is None else v for v in (getattr(t, name) for t in tickers)])
+                for name in _TICKER_COLUMNS
+            },
+        )
+    
+    def to_numpy(self) -> Dict[str, Any]:
+        """零拷贝转换为 numpy 数组字典（需安装 numpy，inst_ids 保持为列表）"""
+        if np is None:
+            raise RuntimeError("TickerBatch.to_numpy 需要安装 numpy")
+        result: Dict[str, Any] = {'inst_ids': self.inst_ids}
+        for name in _TICKER_COLUMNS:
+            result[name] = np.frombuffer(getattr(self, name), dtype=np.float64)
+        return result
+    
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """转换为字典（列名到数值列表）"""
+        result: Dict[str, List[Any]] = {'inst_ids': list(self.inst_ids)}
+        for name in _TICKER_COLUMNS:
+            result[name] = getattr(self, name).tolist()
+        return result
+
+
+@dataclass(slots=True)
 class FundingRateData:
     """资金费率指标"""
     inst_id: str  # 交易对（标准格式）
@@ -312,7 +442,7 @@ class FundingRateData:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ContractBasisData:
     """合约基差指标"""
     inst_id: str  # 合约交易对（标准格式）
@@ -353,6 +483,9 @@ class MarketDataSourcePlugin(ABC):
     - 时间戳：统一使用秒级 Unix 时间戳
     """
     
+    # 批量接口（get_tickers / get_candlesticks_many）的最大并发请求数
+    MAX_CONCURRENT_REQUESTS = 8
+    
     def __init__(self):
         """初始化插件"""
         self._metadata = self._get_metadata()
@@ -399,6 +532,13 @@ class MarketDataSourcePlugin(ABC):
         """
         return bar
     
+    def _clamp_limit(self, limit: int) -> int:
+        """将请求条数限制在 1 到数据源单次最大条数之间
+        
+        在统一接口入口处调用一次，子类实现可直接使用传入的 limit。
+        """
+        return max(1, min(int(limit), self._capability.candlestick_limit))
+    
     def _normalize_timestamp(self, timestamp: Optional[int]) -> Optional[int]:
         """标准化时间戳（由子类覆盖实现内部转换）
         
@@ -615,6 +755,7 @@ class MarketDataSourcePlugin(ABC):
             例如：请求 10m，数据源只有 5m，则获取 5m 数据并合并。
         """
         mode = self._ensure_mode_supported(mode)
+        limit = self._clamp_limit(limit)
 
         # 检查是否直接支持该粒度
         if bar in self._capability.candlestick_granularities:
@@ -652,7 +793,7 @@ class MarketDataSourcePlugin(ABC):
         ratio = requested_seconds // fine_seconds
         
         # 需要获取更多的细粒度数据以聚合为足够的粗粒度数据
-        fine_limit = limit * ratio
+        fine_limit = self._clamp_limit(limit * ratio)
         
         logger.info(
             f"📊 粒度聚合: {self._metadata.name} 不支持 {bar}，"
@@ -682,6 +823,24 @@ class MarketDataSourcePlugin(ABC):
         # 限制返回数量
         return aggregated_candles[-limit:] if len(aggregated_candles) > limit else aggregated_candles
     
+    def get_candlesticks_batch(
+        self,
+        symbol: str,
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> CandleBatch:
+        """
+        获取列式 K线数据（参数同 get_candlesticks）
+        
+        Returns:
+            CandleBatch，各字段为连续的数值数组，适合向量化计算
+        """
+        return CandleBatch.from_candles(
+            self.get_candlesticks(symbol, bar, limit, before, mode)
+        )
+    
     def get_ticker(self, symbol: str, mode: str = SymbolMode.SPOT.value) -> TickerData:
         """
         获取最新行情数据（统一接口）
@@ -707,6 +866,142 @@ class MarketDataSourcePlugin(ABC):
         
         return ticker
     
+    def get_last_price(self, symbol: str, mode: str = SymbolMode.SPOT.value) -> float:
+        """
+        获取最新成交价（统一接口）
+        
+        只需要价格时使用，数据源可覆盖 _get_last_price_impl 走更轻量的接口。
+        
+        Args:
+            symbol: 交易对（标准格式："BTCUSDT"）
+        
+        Returns:
+            最新成交价
+        """
+        mode = self._ensure_mode_supported(mode)
+        source_symbol = self._normalize_symbol(symbol, mode)
+        return self._get_last_price_impl(source_symbol, mode)
+    
+    def _get_last_price_impl(self, symbol: str, mode: str = SymbolMode.SPOT.value) -> float:
+        """获取最新成交价（默认取完整行情中的 last）"""
+        return self._get_ticker_impl(symbol, mode).last
+    
+    def _fan_out(self, func, symbols: List[str], *args, **kwargs) -> Dict[str, Any]:
+        """在线程池中对多个交易对并发调用 func，按输入顺序返回结果
+        
+        并发数受 MAX_CONCURRENT_REQUESTS 限制；任一请求失败时抛出其异常。
+        """
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+        if len(symbols) == 1:
+            return {symbols[0]: func(symbols[0], *args, **kwargs)}
+        
+        max_workers = min(len(symbols), self.MAX_CONCURRENT_REQUESTS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(func, symbol, *args, **kwargs)
+                for symbol in symbols
+            ]
+            return {
+                symbol: future.result()
+                for symbol, future in zip(symbols, futures)
+            }
+    
+    def get_tickers(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """
+        批量获取多个交易对的行情数据（统一接口）
+        
+        Args:
+            symbols: 交易对列表（标准格式："BTCUSDT"）
+        
+        Returns:
+            交易对到行情数据的映射，按输入顺序去重
+        """
+        mode = self._ensure_mode_supported(mode)
+        source_symbols = {
+            symbol: self._normalize_symbol(symbol, mode)
+            for symbol in symbols
+        }
+        
+        # 调用子类实现
+        tickers = self._get_tickers_impl(list(dict.fromkeys(source_symbols.values())), mode)
+        
+        result = {}
+        for symbol, source_symbol in source_symbols.items():
+            ticker = tickers.get(source_symbol)
+            if ticker is None:
+                raise PluginError(f"数据源 {self._metadata.name} 未返回 {symbol} 的行情")
+            # 标准化交易对名称（多个输入映射到同一交易对时各自持有副本）
+            result[symbol] = replace(ticker, inst_id=symbol)
+        return result
+    
+    def get_tickers_batch(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> TickerBatch:
+        """
+        批量获取行情数据并以列式返回（参数同 get_tickers）
+        
+        Returns:
+            TickerBatch，按输入顺序去重，适合对多个交易对做向量化计算
+        """
+        return TickerBatch.from_tickers(list(self.get_tickers(symbols, mode).values()))
+    
+    def _get_tickers_impl(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """批量获取行情数据（子类可覆盖为单次批量请求）
+        
+        symbols 已转换为数据源格式；默认实现并发调用 _get_ticker_impl。
+        返回以数据源格式交易对为键的映射。
+        """
+        return self._fan_out(self._get_ticker_impl, symbols, mode)
+    
+    def get_candlesticks_many(
+        self,
+        symbols: List[str],
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, List[CandleData]]:
+        """
+        批量获取多个交易对的 K线数据（并发请求）
+        
+        Returns:
+            交易对到 K线数据列表的映射
+        """
+        return self._fan_out(self.get_candlesticks, symbols, bar, limit, before, mode)
+    
+    async def aget_tickers(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """get_tickers 的协程版本，供异步调用方使用（在工作线程中执行，不阻塞事件循环）"""
+        return await asyncio.to_thread(self.get_tickers, symbols, mode)
+    
+    async def aget_candlesticks_many(
+        self,
+        symbols: List[str],
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, List[CandleData]]:
+        """get_candlesticks_many 的协程版本（在工作线程中执行，不阻塞事件循环）"""
+        return await asyncio.to_thread(
+            self.get_candlesticks_many, symbols, bar, limit, before, mode
+        )
+    
     def get_funding_rate(self, symbol: str) -> FundingRateData:
         """获取指定合约的资金费率"""
         if not self._capability.supports_funding_rate:
@@ -759,7 +1054,7 @@ class MarketDataSourcePlugin(ABC):
             basis.reference_symbol = reference_symbol
         return basis
     
-    def get_supported_symbols(self) -> List[str]:
+    def get_supported_symbols(self) -> Sequence[str]:
         """获取支持的交易对列表"""
         return self._capability.supported_symbols
     
@@ -7,11 +7,63 @@
 
 from typing import Dict, List
 from datetime import datetime
+import json
+
+try:  # pragma: no cover - 可选依赖，未安装时回退到标准库 json
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
 
 from .base import MarketDataSourcePlugin, DataSourceMetadata, Capability
 from .manager import PluginManager
 
 
+# 功能列表: (能力字段, 支持时的文案, 不支持时的文案)
+_FEATURE_SPEC = (
+    ('supports_candlesticks', "- ✅ K线数据 (OHLCV)", "- ❌ K线数据"),
+    ('supports_ticker', "- ✅ 行情数据 (Ticker)", "- ❌ 行情数据"),
+    ('supports_funding_rate', "- ✅ 资金费率 (Funding Rate)", "- ❌ 资金费率"),
+    ('supports_contract_basis', "- ✅ 合约基差 (Basis)", "- ❌ 合约基差"),
+)
+
+# 可选功能: 仅在支持时列出
+_FEATURE_OPTIONAL = (
+    ('supports_real_time', "- ✅ 实时数据"),
+    ('supports_websocket', "- ✅ WebSocket"),
+)
+
+# 对比表中的布尔标记
+_FLAG = ("❌", "✅")
+
+# 对比表表头及行模板
+_TABLE_HEADER = (
+    "| 插件 | K线 | Ticker | 粒度数 | 速率限制 | 状态 |\n"
+    "|------|-----|--------|--------|---------|------|"
+)
+_ROW_FMT = "| %s | %s | %s | %s | %s | %s |"
+
+
+def _comparison_row(metadata: DataSourceMetadata, capability: Capability) -> str:
+    """生成能力对比表中的一行"""
+    granularities = capability.candlestick_granularities
+    rate_limit = capability.rate_limit_per_minute
+    return _ROW_FMT % (
+        metadata.display_name,
+        _FLAG[bool(capability.supports_candlesticks)],
+        _FLAG[bool(capability.supports_ticker)],
+        len(granularities) if granularities else "∞",
+        f"{rate_limit}/min" if capability.has_rate_limit and rate_limit else "❌",
+        _FLAG[bool(metadata.is_active)],
+    )
+
+
+def _json_default(obj):
+    """序列化元数据/能力描述对象（输出与各自的 to_dict 一致）"""
+    if isinstance(obj, (DataSourceMetadata, Capability)):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 class DocumentationGenerator:
     """文档生成器"""
     
@@ -237,62 +289,40 @@ class DocumentationGenerator:
     @staticmethod
     def _generate_features_section(capability: Capability) -> str:
         """生成功能列表"""
-        features = []
-        if capability.supports_candlesticks:
-            features.append("- ✅ K线数据 (OHLCV)")
-        else:
-            features.append("- ❌ K线数据")
-        
-        if capability.supports_ticker:
-            features.append("- ✅ 行情数据 (Ticker)")
-        else:
-            features.append("- ❌ 行情数据")
-        
-        if capability.supports_funding_rate:
-            features.append("- ✅ 资金费率 (Funding Rate)")
-        else:
-            features.append("- ❌ 资金费率")
-        
-        if capability.supports_contract_basis:
-            features.append("- ✅ 合约基差 (Basis)")
-        else:
-            features.append("- ❌ 合约基差")
-        
-        if capability.supports_real_time:
-            features.append("- ✅ 实时数据")
-        
-        if capability.supports_websocket:
-            features.append("- ✅ WebSocket")
-        
+        features = [
+            yes if getattr(capability, attr) else no
+            for attr, yes, no in _FEATURE_SPEC
+        ]
+        features.extend(
+            line for attr, line in _FEATURE_OPTIONAL if getattr(capability, attr)
+        )
         return "\n".join(features)
     
     @staticmethod
     def _generate_comparison_table(plugin_manager: PluginManager) -> str:
         """生成能力对比表"""
-        plugins = plugin_manager.get_all_plugins()
+        # 仅依赖注册时记录的元数据/能力，避免实例化延迟加载的插件
+        all_metadata = plugin_manager.get_all_metadata()
         
-        if not plugins:
+        if not all_metadata:
             return "*没有已注册的插件*"
         
-        # 构建表头
-        lines = []
-        lines.append("| 插件 | K线 | Ticker | 粒度数 | 速率限制 | 状态 |")
-        lines.append("|------|-----|--------|--------|---------|------|")
-        
-        # 构建行
-        for name, plugin in plugins.items():
-            capability = plugin.get_capability()
-            metadata = plugin.get_metadata()
-            
-            candlestick = "✅" if capability.supports_candlesticks else "❌"
-            ticker = "✅" if capability.supports_ticker else "❌"
-            granularity_count = len(capability.candlestick_granularities) if capability.candlestick_granularities else "∞"
-            rate_limit = f"{capability.rate_limit_per_minute}/min" if capability.has_rate_limit and capability.rate_limit_per_minute else "❌"
-            status = "✅" if metadata.is_active else "❌"
-            
-            lines.append(f"| {metadata.display_name} | {candlestick} | {ticker} | {granularity_count} | {rate_limit} | {status} |")
-        
-        return "\n".join(lines)
+        rows = [
+            _comparison_row(metadata, plugin_manager.get_plugin_capability(name))
+            for name, metadata in all_metadata.items()
+        ]
+        return _TABLE_HEADER + "\n" + "\n".join(rows)
+    
+    @staticmethod
+    def _collect_capabilities(plugin_manager: PluginManager) -> Dict:
+        """收集所有插件的元数据与能力描述"""
+        return {
+            name: {
+                'metadata': plugin.get_metadata().to_dict(),
+                'capability': plugin.get_capability().to_dict(),
+            }
+            for name, plugin in plugin_manager.get_all_plugins().items()
+        }
     
     @staticmethod
     def generate_capabilities_json(plugin_manager: PluginManager) -> Dict:
@@ -302,16 +332,57 @@ class DocumentationGenerator:
         Returns:
             能力描述字典
         """
-        result = {
+        return {
             'generated_at': datetime.now().isoformat(),
-            'plugins': {}
+            'plugins': DocumentationGenerator._collect_capabilities(plugin_manager),
         }
+    
+    @staticmethod
+    def generate_capabilities_payload(plugin_manager: PluginManager) -> Dict:
+        """
+        生成待序列化的能力描述结构
         
-        plugins = plugin_manager.get_all_plugins()
-        for name, plugin in plugins.items():
-            result['plugins'][name] = {
-                'metadata': plugin.get_metadata().to_dict(),
-                'capability': plugin.get_capability().to_dict(),
-            }
+        与 generate_capabilities_json 结构相同，但元数据与能力描述保留为对象，
+        由 serialize 在序列化时逐个通过 to_dict 转换。
+        """
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'plugins': {
+                name: {
+                    'metadata': plugin.get_metadata(),
+                    'capability': plugin.get_capability(),
+                }
+                for name, plugin in plugin_manager.get_all_plugins().items()
+            },
+        }
+    
+    @staticmethod
+    def serialize(payload, indent: bool = False) -> bytes:
+        """
+        将包含元数据/能力描述对象的结构序列化为 JSON（UTF-8 字节串）
         
-        return result
+        安装了 orjson 时由 orjson 直接输出字节串，否则回退到标准库 json。
+        """
+        if orjson is not None:
+            option = orjson.OPT_PASSTHROUGH_DATACLASS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(payload, default=_json_default, option=option)
+        return json.dumps(
+            payload,
+            default=_json_default,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+        ).encode('utf-8')
+    
+    @staticmethod
+    def generate_capabilities_json_bytes(plugin_manager: PluginManager) -> bytes:
+        """
+        生成所有插件能力的 JSON 序列化结果（UTF-8 字节串）
+        
+        Returns:
+            JSON 字节串
+        """
+        return DocumentationGenerator.serialize(
+            DocumentationGenerator.generate_capabilities_payload(plugin_manager)
+        )
@@ -6,37 +6,52 @@
 支持自动扫描 sources/ 目录下的所有 *_plugin.py 文件。
 """
 
-from typing import Dict, List, Optional, Type
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Type
 from importlib import import_module
 import logging
 import os
 import glob
-import importlib.util
 
-from .base import MarketDataSourcePlugin, PluginError, DataSourceMetadata
+from .base import (
+    MarketDataSourcePlugin,
+    PluginError,
+    DataSourceMetadata,
+    Capability,
+    SymbolMode,
+    TickerData,
+)
 
 logger = logging.getLogger(__name__)
 
 
 class PluginManager:
-    """插件管理器"""
+    """插件管理器
     
-    _instance = None
-    _initialized = False
+    全局共享实例通过 get_plugin_manager() 获取；直接实例化会得到
+    一个独立的管理器（便于测试隔离）。
+    """
     
-    def __new__(cls):
-        """单例模式"""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+    __slots__ = (
+        '_plugins',
+        '_plugin_classes',
+        '_failed_plugins',
+        '_capabilities',
+        '_metadata',
+    )
     
     def __init__(self):
         """初始化管理器"""
-        if not self._initialized:
-            self._plugins: Dict[str, MarketDataSourcePlugin] = {}
-            self._plugin_classes: Dict[str, Type[MarketDataSourcePlugin]] = {}
-            self._failed_plugins: Dict[str, str] = {}  # 记录加载失败的插件
-            self._initialized = True
+        self._init_state()
+    
+    def _init_state(self) -> None:
+        """初始化内部状态"""
+        self._plugins: Dict[str, MarketDataSourcePlugin] = {}
+        self._plugin_classes: Dict[str, Type[MarketDataSourcePlugin]] = {}
+        self._failed_plugins: Dict[str, str] = {}  # 记录加载失败的插件
+        # 注册时记录的能力/元数据，查询时无需实例化延迟加载的插件
+        self._capabilities: Dict[str, Capability] = {}
+        self._metadata: Dict[str, DataSourceMetadata] = {}
     
     def auto_discover_plugins(self, sources_dir: Optional[str] = None) -> Dict[str, str]:
         """
@@ -76,7 +91,8 @@ class PluginManager:
                 # 动态导入模块
                 module = import_module(module_name)
                 
-                # 查找插件类（以 Plugin 结尾的类）
+                # 查找插件类（以 Plugin 结尾、且定义在该模块中的类，
+                # 避免误选从其他模块导入的插件类）
                 plugin_class = None
                 for attr_name in dir(module):
                     attr = getattr(module, attr_name)
@@ -84,6 +100,7 @@ class PluginManager:
                         isinstance(attr, type)
                         and issubclass(attr, MarketDataSourcePlugin)
                         and attr is not MarketDataSourcePlugin
+                        and attr.__module__ == module.__name__
                         and attr_name.endswith('Plugin')
                     ):
                         plugin_class = attr
@@ -145,6 +162,7 @@ class PluginManager:
             logger.warning(f"插件 {plugin_name} 已注册，将覆盖")
         
         self._plugins[plugin_name] = plugin_instance
+        self._remember_descriptors(plugin_instance)
         logger.info(f"成功注册插件: {plugin_name} ({plugin_instance.display_name})")
     
     def register_plugin_class(
@@ -173,8 +191,15 @@ class PluginManager:
             plugin_name = temp_instance.name
             self._plugin_classes[plugin_name] = plugin_class
             self._plugins[plugin_name] = None  # 延迟加载
+            self._remember_descriptors(temp_instance)
             logger.info(f"注册插件类: {plugin_name}")
     
+    def _remember_descriptors(self, plugin_instance: MarketDataSourcePlugin) -> None:
+        """记录插件的能力和元数据"""
+        plugin_name = plugin_instance.name
+        self._capabilities[plugin_name] = plugin_instance.get_capability()
+        self._metadata[plugin_name] = plugin_instance.get_metadata()
+    
     def load_plugins_from_directory(self, module_path: str) -> None:
         """
         从指定目录加载所有插件
@@ -184,13 +209,14 @@ class PluginManager:
         """
         try:
             module = import_module(module_path)
-            # 动态发现并加载所有 MarketDataSourcePlugin 子类
+            # 动态发现并加载该包（含子模块）中定义的 MarketDataSourcePlugin 子类
             for attr_name in dir(module):
                 attr = getattr(module, attr_name)
                 if (
                     isinstance(attr, type) 
                     and issubclass(attr, MarketDataSourcePlugin)
                     and attr is not MarketDataSourcePlugin
+                    and (attr.__module__ + '.').startswith(module.__name__ + '.')
                 ):
                     try:
                         self.register_plugin_class(attr)
@@ -235,6 +261,60 @@ class PluginManager:
                 result[name] = plugin
         return result
     
+    def get_ticker_from_sources(
+        self,
+        symbol: str,
+        sources: Optional[Iterable[str]] = None,
+        mode: str = SymbolMode.SPOT.value,
+        timeout: float = 15.0,
+    ) -> Dict[str, TickerData]:
+        """
+        并发向多个数据源获取同一交易对的行情
+        
+        Args:
+            symbol: 交易对（标准格式："BTCUSDT"）
+            sources: 数据源名称列表，默认为所有支持行情的数据源
+            timeout: 整体等待时间（秒），超时未返回的数据源被跳过
+        
+        Returns:
+            数据源名称到行情数据的映射（按 sources 顺序）；
+            失败或超时的数据源记录日志后不出现在结果中
+        """
+        names = list(sources) if sources is not None else self.list_plugin_names()
+        plugins = {}
+        for name in names:
+            capability = self._capabilities.get(name)
+            if capability is not None and not capability.supports_ticker:
+                continue
+            plugin = self.get_plugin(name)
+            if plugin is not None:
+                plugins[name] = plugin
+        if not plugins:
+            return {}
+        
+        # 各请求在 I/O 期间释放 GIL，总耗时约为最慢的一个数据源
+        executor = ThreadPoolExecutor(max_workers=len(plugins), thread_name_prefix='ticker-sources')
+        try:
+            futures = {
+                name: executor.submit(plugin.get_ticker, symbol, mode)
+                for name, plugin in plugins.items()
+            }
+            wait(futures.values(), timeout=timeout)
+        finally:
+            # 不等待超时的请求结束，其线程完成后自行退出
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        results: Dict[str, TickerData] = {}
+        for name, future in futures.items():
+            if not future.done():
+                logger.warning(f"数据源 {name} 获取 {symbol} 行情超时")
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.warning(f"数据源 {name} 获取 {symbol} 行情失败: {e}")
+        return results
+    
     def get_all_metadata(self) -> Dict[str, DataSourceMetadata]:
         """
         获取所有插件的元数据
@@ -242,10 +322,7 @@ class PluginManager:
         Returns:
             插件名称到元数据的映射
         """
-        result = {}
-        for plugin in self.get_all_plugins().values():
-            result[plugin.name] = plugin.get_metadata()
-        return result
+        return dict(self._metadata)
     
     def unregister_plugin(self, name: str) -> None:
         """
@@ -260,6 +337,9 @@ class PluginManager:
         
         if name in self._plugin_classes:
             del self._plugin_classes[name]
+        
+        self._capabilities.pop(name, None)
+        self._metadata.pop(name, None)
     
     def list_plugin_names(self) -> List[str]:
         """获取所有已注册插件的名称"""
@@ -269,12 +349,9 @@ class PluginManager:
         """检查插件是否可用"""
         return name in self._plugins
     
-    def get_plugin_capability(self, name: str):
-        """获取插件的能力描述"""
-        plugin = self.get_plugin(name)
-        if plugin:
-            return plugin.get_capability()
-        return None
+    def get_plugin_capability(self, name: str) -> Optional[Capability]:
+        """获取插件的能力描述（不会触发延迟加载插件的实例化）"""
+        return self._capabilities.get(name)
     
     def get_failed_plugins(self) -> Dict[str, str]:
         """获取加载失败的插件列表"""
@@ -282,19 +359,14 @@ class PluginManager:
     
     def reset(self) -> None:
         """重置管理器（用于测试）"""
-        self._plugins.clear()
-        self._plugin_classes.clear()
-        self._failed_plugins.clear()
+        self._init_state()
         logger.info("插件管理器已重置")
 
 
 # 全局插件管理器实例
-_plugin_manager = None
+_plugin_manager = PluginManager()
 
 
 def get_plugin_manager() -> PluginManager:
     """获取全局插件管理器"""
-    global _plugin_manager
-    if _plugin_manager is None:
-        _plugin_manager = PluginManager()
     return _plugin_manager
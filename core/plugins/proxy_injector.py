@@ -6,7 +6,7 @@
 """
 
 import logging
-from typing import Optional
+from typing import Optional, final
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -14,8 +14,12 @@ from urllib3.util.retry import Retry
 logger = logging.getLogger(__name__)
 
 
+@final
 class ProxyInjector:
-    """代理注入器 - 为插件服务提供统一的代理支持"""
+    """代理注入器 - 为插件服务提供统一的代理支持
+    
+    状态保存在类属性上，所有方法均为类方法，无需实例化。
+    """
     
     _proxy_session = None  # 带代理的 session
     _direct_session = None  # 不带代理的 session
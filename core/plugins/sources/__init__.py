@@ -1,20 +1,33 @@
 # -*- coding: utf-8 -*-
 """
 数据源插件包
+
+插件类按需导入（PEP 562），只有实际访问到的插件才会加载其模块及依赖。
 """
 
-from .okx_plugin import OKXMarketPlugin
-from .binance_plugin import BinanceMarketPlugin
-from .coinbase_plugin import CoinbaseMarketPlugin
-from .coingecko_plugin import CoinGeckoMarketPlugin
-from .kraken_plugin import KrakenMarketPlugin
-from .bybit_plugin import BybitMarketPlugin
-
-__all__ = [
-    'OKXMarketPlugin',
-    'BinanceMarketPlugin',
-    'CoinbaseMarketPlugin',
-    'CoinGeckoMarketPlugin',
-    'KrakenMarketPlugin',
-    'BybitMarketPlugin',
-]
+from importlib import import_module
+
+# 插件类名 -> 所在子模块
+_LAZY = {
+    'OKXMarketPlugin': 'okx_plugin',
+    'BinanceMarketPlugin': 'binance_plugin',
+    'CoinbaseMarketPlugin': 'coinbase_plugin',
+    'CoinGeckoMarketPlugin': 'coingecko_plugin',
+    'KrakenMarketPlugin': 'kraken_plugin',
+    'BybitMarketPlugin': 'bybit_plugin',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # 缓存，后续访问不再经过 __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
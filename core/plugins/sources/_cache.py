@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""插件缓存工具
+
+- `FileCache`: 本地文件缓存，用于不会再变化的历史数据（例如已收盘的 K 线）。
+- `TTLCache`: 进程内短时缓存，用于合并短时间内的重复行情请求。
+- `SingleFlight`: 合并同时进行的相同请求，只发起一次网络调用。
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from ._http import dumps_json, loads_json
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - 插件也可脱离 Django 单独使用
+    from django.conf import settings as django_settings
+except ImportError:  # pragma: no cover
+    django_settings = None
+
+
+def default_cache_dir() -> str:
+    """默认缓存目录
+
+    优先使用 Django 配置或环境变量 PLUGIN_CACHE_DIR，否则使用用户缓存目录
+    （$XDG_CACHE_HOME/geneticgrid，默认 ~/.cache/geneticgrid），不写入代码仓库。
+    """
+    if django_settings is not None and django_settings.configured:
+        configured = getattr(django_settings, 'PLUGIN_CACHE_DIR', None)
+        if configured:
+            return str(configured)
+    configured = os.environ.get('PLUGIN_CACHE_DIR')
+    if configured:
+        return configured
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'geneticgrid')
+
+
+class FileCache:
+    """基于 JSON 文件的 TTL 缓存"""
+
+    def __init__(self, namespace: str, base_dir: Optional[str] = None) -> None:
+        self.namespace = namespace
+        self._base_dir = base_dir
+        self._directory: Optional[str] = None
+
+    @property
+    def directory(self) -> str:
+        # 模块级实例在导入时创建，此时 Django 配置可能尚未加载，首次使用时再确定目录
+        if self._directory is None:
+            self._directory = os.path.join(self._base_dir or default_cache_dir(), self.namespace)
+        return self._directory
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """由任意参数生成缓存键"""
+        raw = "|".join("" if part is None else str(part) for part in parts)
+        return hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                entry = loads_json(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as exc:
+            logger.debug("读取缓存失败 %s: %s", path, exc)
+            return None
+
+        if entry.get('expires', 0) < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return entry.get('data')
+
+    def set(self, key: str, data: Any, ttl: float) -> None:
+        """写入缓存（原子替换，写入失败时静默忽略）"""
+        path = self._path(key)
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 临时文件名由 tempfile 保证唯一，多线程/多进程同时写同一个键也不会互相覆盖
+            with tempfile.NamedTemporaryFile(
+                dir=self.directory, prefix=f"{key}.", suffix='.tmp', delete=False
+            ) as f:
+                tmp_path = f.name
+                f.write(dumps_json({'expires': time.time() + ttl, 'data': data}))
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as exc:
+            logger.debug("写入缓存失败 %s: %s", path, exc)
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+
+class TTLCache:
+    """线程安全的进程内 TTL 缓存，容量满时淘汰最早写入的条目"""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 1.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """读取缓存，未命中或已过期时返回 None"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """写入缓存，ttl 为 None 时使用默认 TTL"""
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SingleFlight:
+    """合并并发的重复调用：同一 key 同时只执行一次，其余调用方等待并共享结果"""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """执行 func，若相同 key 的调用正在进行则直接等待其结果（异常同样共享）"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
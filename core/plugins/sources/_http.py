@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""插件 HTTP 辅助工具"""
+
+import json
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+try:  # pragma: no cover - 可选依赖，未安装时回退到 requests 自带的 json 解析
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:  # pragma: no cover - 可选依赖，HTTP/2 需要 httpx 与 h2
+    import h2  # type: ignore  # noqa: F401
+    import httpx  # type: ignore
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore
+
+HTTP2_AVAILABLE = httpx is not None
+
+# 网络异常类型：同时覆盖 requests 与 httpx（启用 HTTP/2 传输时）
+if httpx is not None:
+    TIMEOUT_ERRORS = (requests.exceptions.Timeout, httpx.TimeoutException)
+    REQUEST_ERRORS = (requests.exceptions.RequestException, httpx.HTTPError)
+else:
+    TIMEOUT_ERRORS = (requests.exceptions.Timeout,)
+    REQUEST_ERRORS = (requests.exceptions.RequestException,)
+
+try:  # pragma: no cover - 可选依赖，用于流式解析大的 JSON 数组响应
+    import ijson  # type: ignore
+except ImportError:  # pragma: no cover
+    ijson = None  # type: ignore
+
+JSON_STREAMING_AVAILABLE = ijson is not None
+
+
+def loads_json(data):
+    """解析 JSON 字节串或字符串（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(obj) -> bytes:
+    """序列化为紧凑的 JSON 字节串（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def decode_json(response):
+    """解析 HTTP 响应体中的 JSON（安装了 orjson 时直接解析原始字节）"""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class _JsonArrayIterator:
+    """iter_json_array 返回的迭代器，close() 在开始迭代前调用也会关闭响应"""
+
+    def __init__(self, response) -> None:
+        self._response = response
+        response.raw.decode_content = True
+        self._items = ijson.items(response.raw, 'item', use_float=True)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._items)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        self._response.close()
+
+
+def iter_json_array(response) -> _JsonArrayIterator:
+    """边下载边逐项解析 JSON 数组（response 需以 stream=True 发起）
+
+    迭代结束、出错或调用 close() 时关闭响应，连接归还连接池。
+    """
+    if ijson is None:
+        raise RuntimeError("流式解析需要安装 ijson")
+    return _JsonArrayIterator(response)
+
+
+def create_pooled_session(
+    user_agent: str = 'GeneticGrid/1.0',
+    pool_size: int = 32,
+    retries: int = 2,
+    backoff_factor: float = 0.1,
+    status_forcelist=(502, 503, 504),
+    pool_maxsize: Optional[int] = None,
+    pool_block: bool = False,
+) -> requests.Session:
+    """创建带连接池、keep-alive 与 GET 重试的 requests session
+
+    并发请求复用已建立的 TCP/TLS 连接，避免默认 10 连接池下的排队与重复握手。
+    pool_size 为缓存的主机连接池数量，pool_maxsize 为每个主机保留的连接数
+    （默认与 pool_size 相同）；pool_block=False 时连接池满会临时新建连接而不是阻塞等待。
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_maxsize or pool_size,
+        max_retries=retry,
+        pool_block=pool_block,
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': user_agent,
+        # 仅声明 urllib3 能解压的编码（brotli/zstd 需安装对应的包）
+        'Accept-Encoding': ACCEPT_ENCODING,
+        'Connection': 'keep-alive',
+    })
+    return session
+
+
+# 进程级共享 session（按名称区分），各插件复用同一组按主机划分的连接池，首次使用时创建
+_SHARED_SESSIONS: Dict[str, requests.Session] = {}
+_SHARED_SESSION_LOCK = threading.Lock()
+
+
+def shared_session(name: str = 'default', **options) -> requests.Session:
+    """获取进程级共享的连接池 session
+
+    需要独立请求头、重试策略或代理设置的插件使用自己的 name；
+    options 在该名称首次创建时传给 create_pooled_session。
+    """
+    session = _SHARED_SESSIONS.get(name)
+    if session is None:
+        with _SHARED_SESSION_LOCK:
+            session = _SHARED_SESSIONS.get(name)
+            if session is None:
+                session = _SHARED_SESSIONS[name] = create_pooled_session(**options)
+    return session
+
+
+def close_shared_session(name: str = 'default') -> None:
+    """关闭指定名称的共享 session，下次获取时重新创建"""
+    with _SHARED_SESSION_LOCK:
+        session = _SHARED_SESSIONS.pop(name, None)
+    if session is not None:
+        session.close()
+
+
+def create_http2_client(
+    headers=None,
+    proxy=None,
+    max_connections: int = 64,
+    max_keepalive_connections: int = 32,
+):
+    """创建 HTTP/2 客户端，多个并发请求复用同一条连接
+
+    返回的 httpx.Client 与 requests.Session 的 get/raise_for_status/content
+    用法兼容；调用前需确认 HTTP2_AVAILABLE。
+    """
+    if httpx is None:
+        raise RuntimeError("HTTP/2 需要安装 httpx[http2]")
+    return httpx.Client(
+        http2=True,
+        headers=headers,
+        proxy=proxy,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        timeout=15,
+    )
+
+
+class RateLimiter:
+    """线程安全的令牌桶限流器
+
+    每个周期 period 秒内最多放行 rate 个权重；pause() 可让所有调用方
+    暂停到指定时间之后（例如服务端提示权重即将用尽时）。
+    """
+
+    def __init__(self, rate: float, period: float = 60.0) -> None:
+        self.capacity = float(rate)
+        self._period = period
+        self._fill_rate = self.capacity / period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, weight: float = 1.0) -> None:
+        """获取 weight 个令牌，不足时阻塞等待；weight 超过桶容量时永远无法满足，直接报错"""
+        if weight > self.capacity:
+            raise ValueError(f"请求权重 {weight} 超过限流器容量 {self.capacity}")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    elapsed = now - self._updated
+                    self._tokens = min(self.capacity, self._tokens + elapsed * self._fill_rate)
+                    self._updated = now
+                    if self._tokens >= weight:
+                        self._tokens -= weight
+                        return
+                    wait = (weight - self._tokens) / self._fill_rate
+            time.sleep(wait)
+
+    def set_rate(self, rate: float) -> None:
+        """调整每个周期放行的权重上限（例如按服务端公布的限额校准）"""
+        with self._lock:
+            self.capacity = float(rate)
+            self._fill_rate = self.capacity / self._period
+            self._tokens = min(self._tokens, self.capacity)
+
+    def pause(self, seconds: float) -> None:
+        """在接下来的 seconds 秒内暂停放行"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
@@ -3,15 +3,23 @@
 币安交易所数据源插件
 """
 
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from typing import List, Optional, Dict
 from datetime import datetime
+from itertools import islice
 import logging
+import os
+import threading
+import time
 import requests
 
 from ..base import (
     MarketDataSourcePlugin,
     DataSourceMetadata,
     Capability,
+    CandleBatch,
     CandleData,
     TickerData,
     FundingRateData,
@@ -19,93 +27,289 @@ from ..base import (
     SourceType,
     PluginError,
     SymbolMode,
+    Granularity,
 )
 from core.proxy_config import get_proxy
+from ._cache import FileCache, SingleFlight, TTLCache
+from ._http import (
+    HTTP2_AVAILABLE,
+    JSON_STREAMING_AVAILABLE,
+    REQUEST_ERRORS,
+    TIMEOUT_ERRORS,
+    RateLimiter,
+    close_shared_session as close_pooled_session,
+    create_http2_client,
+    decode_json,
+    dumps_json,
+    iter_json_array,
+    shared_session,
+)
 from .binance_stream import get_realtime_manager
 
 logger = logging.getLogger(__name__)
 
 
+# 币安专用的共享 session：代理绑定在 session 上，因此不与其他插件共用
+_SESSION_NAME = 'binance'
+_SESSION_OPTIONS = dict(
+    user_agent='GeneticGrid/2.0',
+    pool_size=32,
+    pool_maxsize=64,
+    retries=3,
+    backoff_factor=0.2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    pool_block=False,  # 连接池满时临时新建连接，而不是阻塞等待
+)
+
+# 可选 HTTP/2 传输（BINANCE_HTTP2=true 且已安装 httpx[http2]），首次使用时创建
+_USE_HTTP2 = HTTP2_AVAILABLE and os.environ.get('BINANCE_HTTP2', 'false').lower() in ('true', '1', 'yes')
+_HTTP2_CLIENT = None
+_HTTP2_LOCK = threading.Lock()
+
+
+def _get_http2_client(proxy: Optional[str]):
+    """获取共享的 HTTP/2 客户端"""
+    global _HTTP2_CLIENT
+    with _HTTP2_LOCK:
+        if _HTTP2_CLIENT is None:
+            _HTTP2_CLIENT = create_http2_client(
+                headers={'User-Agent': 'GeneticGrid/2.0'},
+                proxy=proxy,
+            )
+    return _HTTP2_CLIENT
+
+
+def close_shared_session() -> None:
+    """关闭共享的 HTTP 连接池（进程退出时调用）"""
+    global _HTTP2_CLIENT
+    close_pooled_session(_SESSION_NAME)
+    with _HTTP2_LOCK:
+        if _HTTP2_CLIENT is not None:
+            _HTTP2_CLIENT.close()
+            _HTTP2_CLIENT = None
+
+# 已收盘的历史 K 线不会再变化，缓存到本地文件
+_KLINE_CACHE = FileCache('binance')
+_CLOSED_KLINE_TTL = 30 * 86400
+# 回测等场景会反复读取同一历史窗口，最近使用的窗口同时保存在内存中
+_KLINE_MEMORY_CACHE = TTLCache(maxsize=256, ttl=_CLOSED_KLINE_TTL)
+
+# 合并 1 秒内对同一交易对的重复行情请求
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=1.0)
+# 资金费率按结算周期变化，基差随价格波动，分别使用不同的 TTL
+_FUNDING_CACHE = TTLCache(maxsize=512, ttl=30.0)
+_BASIS_CACHE = TTLCache(maxsize=512, ttl=2.0)
+
+# 并发的相同 K 线请求共享一次 HTTP 调用与 JSON 解析
+_KLINE_INFLIGHT = SingleFlight()
+
+# 基差历史需要的现货/合约两次请求并发发起（线程在首次提交时才创建）
+_PAIR_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='binance-pair')
+
+# 现货与合约接口分别计算请求权重。初始值为币安公布的每分钟上限（现货 6000、合约 2400），
+# 首次请求某个接口域名时按 exchangeInfo 返回的 REQUEST_WEIGHT 限额校准
+_SPOT_LIMITER = RateLimiter(6000, 60)
+_FAPI_LIMITER = RateLimiter(2400, 60)
+_WEIGHT_LIMITS_LOADED: set = set()  # 已校准过的 exchangeInfo 地址
+_WEIGHT_LIMITS_LOCK = threading.Lock()
+# exchangeInfo 的请求权重：现货按单个交易对查询计 2，合约计 1
+_SPOT_EXCHANGE_INFO_WEIGHT = 2
+# /ticker/24hr 的请求权重：单个交易对计 2，批量查询封顶 80，合约全量查询计 40
+_TICKER_WEIGHT = 2
+_MAX_TICKERS_WEIGHT = 80
+_FAPI_ALL_TICKERS_WEIGHT = 40
+# 服务端返回的已用权重超过该比例时，暂停到下一个整分钟窗口
+_USED_WEIGHT_BACKOFF_RATIO = 0.9
+
+
+def _close_stream(items) -> None:
+    """关闭 _iter_json_array 返回的流式迭代器（一次性解析的结果无需关闭）"""
+    close = getattr(items, "close", None)
+    if close is not None:
+        close()
+
+
+def _close_future_stream(future) -> None:
+    """请求结束后关闭其流式响应（供 Future.add_done_callback 使用）"""
+    if not future.cancelled() and future.exception() is None:
+        _close_stream(future.result())
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_GRANULARITIES = (
+    "1s",
+    "1m", "3m", "5m", "15m", "30m",
+    "1h", "2h", "4h", "6h", "12h",
+    "1d", "3d", "1w", "1M",
+)
+
+_SUPPORTED_SYMBOLS = (
+    # 主流 USDT 交易对
+    "BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT",
+    "SOLUSDT", "DOGEUSDT", "DOTUSDT", "MATICUSDT", "LTCUSDT",
+    "AVAXUSDT", "LINKUSDT", "ATOMUSDT", "UNIUSDT", "ETCUSDT",
+    "SHIBUSDT", "TRXUSDT", "BCHUSDT", "NEARUSDT", "APTUSDT",
+    # Binance 支持 1000+ 交易对
+)
+
+# Binance 的周期写法与标准粒度一致，命中即原样返回
+_BAR_SET = frozenset(_GRANULARITIES)
+
+# 现货最新 K 线优先由 WebSocket 实时缓存提供的周期
+_REALTIME_INTERVALS = frozenset({"1s", "1m"})
+
+_LAST_UPDATED = datetime(2025, 12, 5)
+
+_METADATA = DataSourceMetadata(
+    name="binance",
+    display_name="币安交易所",
+    description="全球最大的加密货币交易平台，提供现货、合约、期权等多种交易产品，日交易量超过 300 亿美元",
+    source_type=SourceType.EXCHANGE,
+    website="https://www.binance.com",
+    api_base_url="https://api.binance.com",
+    plugin_version="2.0.0",
+    author="GeneticGrid Team",
+    last_updated=_LAST_UPDATED,
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=True,  # 币安在某些地区被墙
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=True,
+    candlestick_granularities=_GRANULARITIES,
+    candlestick_limit=1000,  # Binance 最多返回 1000 条
+    candlestick_max_history_days=None,
+    supports_ticker=True,
+    ticker_update_frequency=1,
+    supported_symbols=_SUPPORTED_SYMBOLS,
+    symbol_format="BTCUSDT",  # 币安格式
+    symbol_modes=(SymbolMode.SPOT.value, SymbolMode.CONTRACT.value),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=True,
+    has_rate_limit=True,
+    rate_limit_per_minute=1200,
+    supports_real_time=False,
+    supports_websocket=True,
+    # 衍生品指标
+    supports_funding_rate=True,
+    funding_rate_interval_hours=8,
+    funding_rate_quote_currency="USDT",
+    supports_contract_basis=True,
+    contract_basis_types=("perpetual",),
+    contract_basis_tenors=("perpetual",),
+)
+
+
 class BinanceMarketPlugin(MarketDataSourcePlugin):
     """币安交易所数据源插件"""
     
     BASE_URL = "https://api.binance.com"
     FAPI_BASE_URL = "https://fapi.binance.com"  # 合约API
     
+    # 各端点完整 URL，避免每次请求拼接字符串
+    _KLINES_URL = BASE_URL + "/api/v3/klines"
+    _TICKER_URL = BASE_URL + "/api/v3/ticker/24hr"
+    _PRICE_URL = BASE_URL + "/api/v3/ticker/price"
+    _FAPI_KLINES_URL = FAPI_BASE_URL + "/fapi/v1/klines"
+    _FAPI_TICKER_URL = FAPI_BASE_URL + "/fapi/v1/ticker/24hr"
+    _FAPI_PRICE_URL = FAPI_BASE_URL + "/fapi/v1/ticker/price"
+    _FAPI_PREMIUM_INDEX_URL = FAPI_BASE_URL + "/fapi/v1/premiumIndex"
+    _FAPI_FUNDING_RATE_URL = FAPI_BASE_URL + "/fapi/v1/fundingRate"
+    _EXCHANGE_INFO_URL = BASE_URL + "/api/v3/exchangeInfo"
+    _FAPI_EXCHANGE_INFO_URL = FAPI_BASE_URL + "/fapi/v1/exchangeInfo"
+    MAX_CONCURRENT_REQUESTS = 20
+    
     def __init__(self):
         self._session = None
+        self._proxies: Optional[Dict[str, str]] = None
         self._realtime = get_realtime_manager()
         super().__init__()
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取币安元数据"""
-        return DataSourceMetadata(
-            name="binance",
-            display_name="币安交易所",
-            description="全球最大的加密货币交易平台，提供现货、合约、期权等多种交易产品，日交易量超过 300 亿美元",
-            source_type=SourceType.EXCHANGE,
-            website="https://www.binance.com",
-            api_base_url="https://api.binance.com",
-            plugin_version="2.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 12, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=True,  # 币安在某些地区被墙
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取币安能力"""
-        return Capability(
-            supports_candlesticks=True,
-            candlestick_granularities=[
-                "1s",
-                "1m", "3m", "5m", "15m", "30m",
-                "1h", "2h", "4h", "6h", "12h",
-                "1d", "3d", "1w", "1M"
-            ],
-            candlestick_limit=1000,  # Binance 最多返回 1000 条
-            candlestick_max_history_days=None,
-            supports_ticker=True,
-            ticker_update_frequency=1,
-            supported_symbols=[
-                # 主流 USDT 交易对
-                "BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT",
-                "SOLUSDT", "DOGEUSDT", "DOTUSDT", "MATICUSDT", "LTCUSDT",
-                "AVAXUSDT", "LINKUSDT", "ATOMUSDT", "UNIUSDT", "ETCUSDT",
-                "SHIBUSDT", "TRXUSDT", "BCHUSDT", "NEARUSDT", "APTUSDT",
-                # Binance 支持 1000+ 交易对
-            ],
-            symbol_format="BTCUSDT",  # 币安格式
-            symbol_modes=[SymbolMode.SPOT.value, SymbolMode.CONTRACT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=True,
-            has_rate_limit=True,
-            rate_limit_per_minute=1200,
-            supports_real_time=False,
-            supports_websocket=True,
-            # 衍生品指标
-            supports_funding_rate=True,
-            funding_rate_interval_hours=8,
-            funding_rate_quote_currency="USDT",
-            supports_contract_basis=True,
-            contract_basis_types=["perpetual"],
-            contract_basis_tenors=["perpetual"],
-        )
+        return _CAPABILITY
     
-    @property
-    def _get_session(self):
-        """获取 requests session，自动配置代理"""
+    def _ensure_session(self):
+        """首次请求时读取一次代理配置，并绑定共享 HTTP session"""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                'User-Agent': 'GeneticGrid/2.0'
-            })
-            # 配置代理
-            self._session.proxies = self._get_proxies()
+            self._proxies = self._get_proxies()
+            if _USE_HTTP2:
+                self._session = _get_http2_client(self._proxies.get('https'))
+            else:
+                session = shared_session(_SESSION_NAME, **_SESSION_OPTIONS)
+                session.proxies = self._proxies
+                self._session = session
         return self._session
     
+    def _get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        stream: bool = False,
+        weight: int = 1,
+    ) -> requests.Response:
+        """限流后发起 GET 请求，并根据 X-MBX-USED-WEIGHT-1M 主动退避
+        
+        weight 为该请求在币安侧计入的权重，批量接口按交易对数量计算。
+        """
+        session = self._session or self._ensure_session()
+        is_fapi = url.startswith(self.FAPI_BASE_URL)
+        limiter = _FAPI_LIMITER if is_fapi else _SPOT_LIMITER
+        info_url = self._FAPI_EXCHANGE_INFO_URL if is_fapi else self._EXCHANGE_INFO_URL
+        if info_url not in _WEIGHT_LIMITS_LOADED:
+            self._load_weight_limit(session, info_url, limiter)
+        limiter.acquire(weight)
+        if stream:
+            response = session.get(url, params=params, timeout=15, stream=True)
+        else:
+            response = session.get(url, params=params, timeout=15)
+        
+        used_weight = response.headers.get("X-MBX-USED-WEIGHT-1M")
+        if used_weight and int(used_weight) > limiter.capacity * _USED_WEIGHT_BACKOFF_RATIO:
+            # 币安按整分钟窗口重置权重
+            remaining = 60 - time.time() % 60
+            logger.warning(f"Binance 请求权重已用 {used_weight}，暂停 {remaining:.1f} 秒")
+            limiter.pause(remaining)
+        
+        response.raise_for_status()
+        return response
+    
+    def _load_weight_limit(self, session: requests.Session, info_url: str, limiter: RateLimiter) -> None:
+        """按 exchangeInfo 中的每分钟 REQUEST_WEIGHT 限额校准限流器（每个接口只查询一次）"""
+        with _WEIGHT_LIMITS_LOCK:
+            if info_url in _WEIGHT_LIMITS_LOADED:
+                return
+            # 无论成功与否都只尝试一次，失败时沿用公布的默认限额
+            _WEIGHT_LIMITS_LOADED.add(info_url)
+            try:
+                if info_url == self._FAPI_EXCHANGE_INFO_URL:
+                    limiter.acquire(1)
+                    response = session.get(info_url, timeout=15)
+                else:
+                    # 只查询一个交易对，响应体很小，rateLimits 照常返回
+                    limiter.acquire(_SPOT_EXCHANGE_INFO_WEIGHT)
+                    response = session.get(info_url, params={"symbol": "BTCUSDT"}, timeout=15)
+                response.raise_for_status()
+                rate_limits = decode_json(response).get("rateLimits") or []
+            except Exception as e:
+                logger.warning(f"Binance 获取请求权重限额失败，沿用默认值: {e}")
+                return
+
+        for item in rate_limits:
+            if (
+                item.get("rateLimitType") == "REQUEST_WEIGHT"
+                and item.get("interval") == "MINUTE"
+                and int(item.get("intervalNum", 1)) == 1
+            ):
+                limiter.set_rate(int(item["limit"]))
+                return
+
     def _get_proxies(self) -> Dict[str, str]:
         """获取代理配置"""
         proxy = get_proxy()
@@ -115,22 +319,28 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
         logger.warning("Binance 未配置代理，可能无法访问")
         return {}
     
+    def _iter_json_array(self, url: str, params: Optional[dict] = None):
+        """逐项读取 JSON 数组响应
+        
+        安装了 ijson 时流式解析，行数据边下载边处理，不必先构建完整列表；
+        否则（或使用 HTTP/2 传输时）一次性解析。
+        """
+        if JSON_STREAMING_AVAILABLE and not _USE_HTTP2:
+            return iter_json_array(self._get(url, params, stream=True))
+        return iter(decode_json(self._get(url, params)))
+    
     def _convert_symbol(self, inst_id: str, mode: str = SymbolMode.SPOT.value) -> str:
-        """将标准格式转换为 Binance 格式: BTC-USDT -> BTCUSDT"""
-        symbol = inst_id.replace("-", "")
-        # 币安合约也使用相同格式
-        return symbol
+        """将标准格式转换为 Binance 格式: BTC-USDT -> BTCUSDT（合约格式相同）"""
+        return inst_id.replace("-", "")
     
     def _convert_bar(self, bar: str) -> str:
         """将时间周期转换为 Binance 格式"""
-        mapping = {
-            "tick": "1s",
-            "1s": "1s",
-            "1m": "1m", "3m": "3m", "5m": "5m", "15m": "15m", "30m": "30m",
-            "1h": "1h", "2h": "2h", "4h": "4h", "6h": "6h", "12h": "12h",
-            "1d": "1d", "3d": "3d", "1w": "1w", "1M": "1M"
-        }
-        return mapping.get(bar, "1h")
+        if bar in _BAR_SET:
+            return bar
+        if bar == "tick":
+            return "1s"
+        logger.warning(f"Binance 不支持的周期 {bar}，回退为 1h")
+        return "1h"
 
     def _fetch_rest_candles(
         self,
@@ -141,54 +351,121 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
         mode: str = SymbolMode.SPOT.value
     ) -> List[CandleData]:
         """通过 REST API 获取 K 线数据"""
+        return self._parse_klines(
+            self._fetch_rest_klines(binance_symbol, interval, limit, before, mode)
+        )
+
+    def _fetch_rest_klines(
+        self,
+        binance_symbol: str,
+        interval: str,
+        limit: int,
+        before: Optional[int],
+        mode: str = SymbolMode.SPOT.value
+    ) -> list:
+        """通过 REST API 获取原始 K 线数组（带文件缓存与并发合并）"""
         # 根据模式选择不同的API端点
         if mode == SymbolMode.CONTRACT.value:
-            url = f"{self.FAPI_BASE_URL}/fapi/v1/klines"
+            url = self._FAPI_KLINES_URL
         else:
-            url = f"{self.BASE_URL}/api/v3/klines"
+            url = self._KLINES_URL
             
         params = {
             "symbol": binance_symbol,
             "interval": interval,
-            "limit": min(limit, 1000)
+            "limit": limit,  # 已由基类按 candlestick_limit 截断
         }
         if before:
             params["endTime"] = before * 1000
 
-        response = self._get_session.get(url, params=params, timeout=15)
-        response.raise_for_status()
-        data = response.json()
+        # 仅缓存指定了 before 的历史窗口，最新窗口包含未收盘的 K 线
+        request_key = (mode, binance_symbol, interval, params["limit"], before)
+        cache_key = None
+        if before:
+            # 先查进程内缓存（免去读文件与 JSON 解析），再查文件缓存
+            data = _KLINE_MEMORY_CACHE.get(request_key)
+            if data:
+                return data
+            cache_key = FileCache.make_key(*request_key)
+            data = _KLINE_CACHE.get(cache_key)
+            if data:
+                _KLINE_MEMORY_CACHE.set(request_key, data)
+                return data
+
+        data = _KLINE_INFLIGHT.do(request_key, lambda: decode_json(self._get(url, params)))
 
         if not data:
             raise PluginError("Binance 返回数据为空")
 
-        candles = []
-        for item in data:
-            candles.append(CandleData(
-                time=int(item[0]) // 1000,
-                open=float(item[1]),
-                high=float(item[2]),
-                low=float(item[3]),
-                close=float(item[4]),
-                volume=float(item[5]),
-            ))
-        return candles
-
-    def _merge_realtime_data(
-        self,
-        rest_candles: List[CandleData],
-        realtime_candles: List[CandleData],
-        limit: int
-    ) -> List[CandleData]:
-        if not realtime_candles:
-            return rest_candles
+        if cache_key and self._all_klines_closed(data, interval):
+            _KLINE_CACHE.set(cache_key, data, _CLOSED_KLINE_TTL)
+            _KLINE_MEMORY_CACHE.set(request_key, data)
+
+        return data
+
+    @staticmethod
+    def _all_klines_closed(data: list, interval: str) -> bool:
+        """判断返回的 K 线是否均已收盘"""
+        # 月线长度不固定，按最长 31 天判断
+        interval_seconds = 31 * 86400 if interval == "1M" else Granularity.to_seconds(interval)
+        if not interval_seconds:
+            return False
+        last_open = int(data[-1][0]) // 1000
+        return last_open + interval_seconds <= time.time()
+
+    @staticmethod
+    def _parse_klines(data: list) -> List[CandleData]:
+        """解析 Binance K 线数组
+        
+        每行格式: [openTime(ms), open, high, low, close, volume, closeTime, ...]
+        """
+        _int, _float, _candle = int, float, CandleData
+        return [
+            _candle(_int(t) // 1000, _float(o), _float(h), _float(l), _float(c), _float(v))
+            for t, o, h, l, c, v, *_ in data
+        ]
+
+    @staticmethod
+    def _parse_klines_batch(data: list) -> CandleBatch:
+        """将 Binance K 线数组直接解码为列式数据
+        
+        先按列转置，再由 array 在 C 层逐列转换数值，不创建 CandleData 对象。
+        """
+        if not data:
+            return CandleBatch()
+        open_times, opens, highs, lows, closes, volumes = islice(zip(*data), 6)
+        return CandleBatch(
+            time=array('q', [int(t) // 1000 for t in open_times]),
+            open=array('d', map(float, opens)),
+            high=array('d', map(float, highs)),
+            low=array('d', map(float, lows)),
+            close=array('d', map(float, closes)),
+            volume=array('d', map(float, volumes)),
+        )
+
+    @staticmethod
+    def _parse_basis_history(contract_klines, spot_klines, inst_id: str) -> List[dict]:
+        """由逐行配对的合约/现货 K 线计算基差序列
+        
+        只取开盘时间与收盘价两列，内置函数绑定为局部变量以减少循环内的查找。
+        """
+        _int, _float = int, float
+        history = []
+        append = history.append
+        for contract_k, spot_k in zip(contract_klines, spot_klines):
+            contract_close = _float(contract_k[4])
+            spot_close = _float(spot_k[4])
+            basis = contract_close - spot_close
+            append({
+                "timestamp": _int(contract_k[0]) // 1000,
+                "basis": basis,
+                "basis_rate": (basis / spot_close * 100) if spot_close != 0 else 0.0,
+                "contract_price": contract_close,
+                "spot_price": spot_close,
+                "inst_id": inst_id,
+            })
+        return history
 
-        merged = {c.time: c for c in rest_candles}
-        for candle in realtime_candles:
-            merged[candle.time] = candle
-        ordered = sorted(merged.values(), key=lambda c: c.time)
-        return ordered[-limit:]
-    
     def _get_candlesticks_impl(
         self,
         symbol: str,
@@ -205,35 +482,74 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
             # 合约模式暂不支持实时WebSocket
             use_realtime = (
                 mode == SymbolMode.SPOT.value and 
-                interval == "1s" and 
+                interval in _REALTIME_INTERVALS and 
                 before is None and 
                 self._realtime.enabled
             )
 
             realtime_candles: List[CandleData] = []
+            live = False
             if use_realtime:
                 realtime_candles = self._realtime.get_latest_candles(
                     binance_symbol,
                     interval,
                     limit * 2
                 )
-                if len(realtime_candles) >= limit:
+                # 连接未建立、尚无推送或推送停滞时，缓冲区里只有回填的旧数据，不能直接返回
+                live = self._realtime.is_live(binance_symbol, interval)
+                if live and len(realtime_candles) >= limit:
                     logger.debug("⚡ 使用 Binance WebSocket 实时缓存 (%s) 返回 %d 条数据", symbol, len(realtime_candles))
                     return realtime_candles[-limit:]
 
             rest_candles = self._fetch_rest_candles(binance_symbol, interval, limit, before, mode)
 
-            if use_realtime and realtime_candles:
-                merged = self._merge_realtime_data(rest_candles, realtime_candles, limit)
-                logger.debug("🔄 合并实时与 REST 数据: REST=%d, WS=%d", len(rest_candles), len(realtime_candles))
-                return merged
+            # 回填成功说明 REST 与实时数据首尾相接，直接从缓存取最新数据；
+            # 两者之间有缺口时只返回 REST 数据，避免拼出断档的序列
+            if live and self._realtime.prime(binance_symbol, interval, rest_candles):
+                return self._realtime.get_latest_candles(binance_symbol, interval, limit)
 
             return rest_candles
             
-        except requests.exceptions.Timeout:
+        except TIMEOUT_ERRORS:
             logger.error("Binance API 连接超时")
             raise PluginError("Binance API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
+            logger.error(f"Binance 获取 K线数据失败: {e}")
+            raise PluginError(f"Binance API 网络错误: {e}")
+        except Exception as e:
+            logger.error(f"Binance 获取 K线数据失败: {e}")
+            raise PluginError(f"Binance 获取 K线数据失败: {e}")
+    
+    def get_candlesticks_batch(
+        self,
+        symbol: str,
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> CandleBatch:
+        """获取列式 K线数据，REST 结果直接解码为列
+        
+        需要聚合粒度或走 WebSocket 实时缓存时回退到基类实现。
+        """
+        mode = self._ensure_mode_supported(mode)
+        uses_realtime = (
+            mode == SymbolMode.SPOT.value and
+            bar in _REALTIME_INTERVALS and
+            before is None and
+            self._realtime.enabled
+        )
+        if bar not in _BAR_SET or uses_realtime:
+            return super().get_candlesticks_batch(symbol, bar, limit, before, mode)
+        
+        try:
+            data = self._fetch_rest_klines(
+                self._convert_symbol(symbol, mode), bar, self._clamp_limit(limit), before, mode
+            )
+            return self._parse_klines_batch(data)
+        except PluginError:
+            raise
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取 K线数据失败: {e}")
             raise PluginError(f"Binance API 网络错误: {e}")
         except Exception as e:
@@ -248,62 +564,147 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
         """获取行情数据"""
         try:
             binance_symbol = self._convert_symbol(symbol, mode)
+            cache_key = (mode, binance_symbol)
+            cached = _TICKER_CACHE.get(cache_key)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             
-            # 根据模式选择不同的API端点
-            if mode == SymbolMode.CONTRACT.value:
-                url = f"{self.FAPI_BASE_URL}/fapi/v1/ticker/24hr"
-            else:
-                url = f"{self.BASE_URL}/api/v3/ticker/24hr"
-                
+            url = self._ticker_url(mode)
             params = {"symbol": binance_symbol}
             
-            response = self._get_session.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            response = self._get(url, params, weight=_TICKER_WEIGHT)
             
-            last = float(data['lastPrice'])
-            open_price = float(data['openPrice'])
+            ticker = self._parse_ticker(symbol, decode_json(response))
+            _TICKER_CACHE.set(cache_key, ticker)
+            return replace(ticker)
             
-            # 计算24h涨跌
-            change_24h = last - open_price
-            change_24h_pct = (change_24h / open_price * 100) if open_price else None
-            volume_24h = float(data.get('volume', 0) or 0)
-            volume_24h = volume_24h if volume_24h > 0 else None
-            
-            return TickerData(
-                inst_id=symbol,
-                last=last,
-                bid=float(data.get('bidPrice', 0)) or None,
-                ask=float(data.get('askPrice', 0)) or None,
-                high_24h=float(data.get('highPrice', 0)) or None,
-                low_24h=float(data.get('lowPrice', 0)) or None,
-                change_24h=change_24h,
-                change_24h_pct=change_24h_pct,
-                volume_24h=volume_24h,
-            )
-            
-        except requests.exceptions.Timeout:
+        except TIMEOUT_ERRORS:
             logger.error("Binance API 连接超时")
             raise PluginError("Binance API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取行情数据失败: {e}")
             raise PluginError(f"Binance API 网络错误: {e}")
         except Exception as e:
             logger.error(f"Binance 获取行情数据失败: {e}")
             raise PluginError(f"Binance 获取行情数据失败: {e}")
     
+    def _get_tickers_impl(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """批量获取行情数据，未命中缓存的交易对合并为一次请求"""
+        tickers: Dict[str, TickerData] = {}
+        missing: Dict[str, str] = {}
+        for symbol in symbols:
+            binance_symbol = self._convert_symbol(symbol, mode)
+            cached = _TICKER_CACHE.get((mode, binance_symbol))
+            if cached is not None:
+                # get_tickers 会为每个结果生成副本，这里可以直接返回缓存对象
+                tickers[symbol] = cached
+            else:
+                missing[binance_symbol] = symbol
+        if not missing:
+            return tickers
+        
+        try:
+            if mode == SymbolMode.CONTRACT.value:
+                # 合约接口不支持 symbols 参数，只能拉取全部后筛选
+                params = None
+                weight = _FAPI_ALL_TICKERS_WEIGHT
+            else:
+                params = {"symbols": dumps_json(list(missing)).decode()}
+                weight = min(_TICKER_WEIGHT * len(missing), _MAX_TICKERS_WEIGHT)
+            
+            response = self._get(self._ticker_url(mode), params, weight=weight)
+            
+            for item in decode_json(response):
+                symbol = missing.get(item.get('symbol'))
+                if symbol is None:
+                    continue
+                ticker = self._parse_ticker(symbol, item)
+                _TICKER_CACHE.set((mode, item['symbol']), ticker)
+                tickers[symbol] = ticker
+            return tickers
+            
+        except TIMEOUT_ERRORS:
+            logger.error("Binance API 连接超时")
+            raise PluginError("Binance API 连接超时")
+        except REQUEST_ERRORS as e:
+            logger.error(f"Binance 批量获取行情数据失败: {e}")
+            raise PluginError(f"Binance API 网络错误: {e}")
+        except Exception as e:
+            logger.error(f"Binance 批量获取行情数据失败: {e}")
+            raise PluginError(f"Binance 批量获取行情数据失败: {e}")
+    
+    def _get_last_price_impl(
+        self,
+        symbol: str,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> float:
+        """通过 /ticker/price 获取最新价（权重低于 /ticker/24hr，响应也更小）"""
+        try:
+            url = self._FAPI_PRICE_URL if mode == SymbolMode.CONTRACT.value else self._PRICE_URL
+            response = self._get(url, {"symbol": self._convert_symbol(symbol, mode)})
+            return float(decode_json(response)['price'])
+            
+        except TIMEOUT_ERRORS:
+            logger.error("Binance API 连接超时")
+            raise PluginError("Binance API 连接超时")
+        except REQUEST_ERRORS as e:
+            logger.error(f"Binance 获取最新价失败: {e}")
+            raise PluginError(f"Binance API 网络错误: {e}")
+        except Exception as e:
+            logger.error(f"Binance 获取最新价失败: {e}")
+            raise PluginError(f"Binance 获取最新价失败: {e}")
+    
+    def _ticker_url(self, mode: str) -> str:
+        """根据模式选择 24h 行情端点"""
+        if mode == SymbolMode.CONTRACT.value:
+            return self._FAPI_TICKER_URL
+        return self._TICKER_URL
+    
+    @staticmethod
+    def _parse_ticker(symbol: str, data: dict) -> TickerData:
+        """解析 24h 行情数据"""
+        last = float(data['lastPrice'])
+        open_price = float(data['openPrice'])
+        
+        # 计算24h涨跌
+        change_24h = last - open_price
+        change_24h_pct = (change_24h / open_price * 100) if open_price else None
+        volume_24h = float(data.get('volume', 0) or 0)
+        volume_24h = volume_24h if volume_24h > 0 else None
+        
+        return TickerData(
+            inst_id=symbol,
+            last=last,
+            bid=float(data.get('bidPrice', 0)) or None,
+            ask=float(data.get('askPrice', 0)) or None,
+            high_24h=float(data.get('highPrice', 0)) or None,
+            low_24h=float(data.get('lowPrice', 0)) or None,
+            change_24h=change_24h,
+            change_24h_pct=change_24h_pct,
+            volume_24h=volume_24h,
+        )
+    
+    def _get_premium_index(self, binance_symbol: str) -> dict:
+        """获取合约的标记价格、指数价格与资金费率"""
+        response = self._get(self._FAPI_PREMIUM_INDEX_URL, {"symbol": binance_symbol})
+        return decode_json(response)
+    
     def _get_funding_rate_impl(self, symbol: str) -> FundingRateData:
         """获取资金费率 - 仅合约"""
         try:
             binance_symbol = self._convert_symbol(symbol, SymbolMode.CONTRACT.value)
+            cached = _FUNDING_CACHE.get(binance_symbol)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             
             # 币安合约API获取资金费率
-            url = f"{self.FAPI_BASE_URL}/fapi/v1/premiumIndex"
-            params = {"symbol": binance_symbol}
-            
-            response = self._get_session.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
+            data = self._get_premium_index(binance_symbol)
             
             # 解析资金费率数据
             funding_rate = float(data.get('lastFundingRate', 0))
@@ -314,7 +715,7 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
             mark_price = float(data.get('markPrice', 0)) if data.get('markPrice') else None
             index_price = float(data.get('indexPrice', 0)) if data.get('indexPrice') else None
             
-            return FundingRateData(
+            funding = FundingRateData(
                 inst_id=symbol,
                 funding_rate=funding_rate,
                 timestamp=timestamp,
@@ -325,11 +726,13 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
                 premium_index=mark_price - index_price if mark_price and index_price else None,
                 quote_currency="USDT"
             )
+            _FUNDING_CACHE.set(binance_symbol, funding)
+            return replace(funding)
             
-        except requests.exceptions.Timeout:
+        except TIMEOUT_ERRORS:
             logger.error("Binance 资金费率API 连接超时")
             raise PluginError("Binance 资金费率API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取资金费率失败: {e}")
             raise PluginError(f"Binance 资金费率API 网络错误: {e}")
         except Exception as e:
@@ -341,35 +744,35 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
         try:
             binance_symbol = self._convert_symbol(symbol, SymbolMode.CONTRACT.value)
             
-            url = f"{self.FAPI_BASE_URL}/fapi/v1/fundingRate"
+            url = self._FAPI_FUNDING_RATE_URL
             params = {
                 "symbol": binance_symbol,
                 "limit": min(limit, 1000)  # 币安限制最多1000条
             }
             
-            response = self._get_session.get(url, params=params, timeout=15)
-            response.raise_for_status()
-            data = response.json()
-            
-            history = []
-            for item in data:
-                funding_time = int(item.get('fundingTime', 0)) // 1000 if item.get('fundingTime') else None
-                funding_rate = float(item.get('fundingRate', 0))
-                
-                history.append({
-                    "timestamp": funding_time,
-                    "funding_rate": funding_rate,
-                    "inst_id": binance_symbol
-                })
-            
-            # 按时间排序（从旧到新）
-            history.sort(key=lambda x: x["timestamp"] if x["timestamp"] else 0)
+            # 逐条解析（安装 ijson 时边下载边构建结果）
+            data = self._iter_json_array(url, params)
+            
+            _int, _float = int, float
+            history = [
+                {
+                    "timestamp": _int(item['fundingTime']) // 1000 if item.get('fundingTime') else None,
+                    "funding_rate": _float(item.get('fundingRate', 0)),
+                    "inst_id": binance_symbol,
+                }
+                for item in data
+            ]
+            
+            # 币安按时间升序返回，仅在顺序异常时才排序（从旧到新）
+            timestamps = [h["timestamp"] or 0 for h in history]
+            if any(a > b for a, b in zip(timestamps, islice(timestamps, 1, None))):
+                history.sort(key=lambda x: x["timestamp"] if x["timestamp"] else 0)
             return history
             
-        except requests.exceptions.Timeout:
+        except TIMEOUT_ERRORS:
             logger.error("Binance 资金费率历史API 连接超时")
             raise PluginError("Binance 资金费率历史API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取资金费率历史失败: {e}")
             raise PluginError(f"Binance 资金费率历史API 网络错误: {e}")
         except Exception as e:
@@ -386,37 +789,27 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
         """获取合约基差"""
         try:
             binance_symbol = self._convert_symbol(symbol, SymbolMode.CONTRACT.value)
+            cache_key = (binance_symbol, contract_type)
+            cached = _BASIS_CACHE.get(cache_key)
+            if cached is not None:
+                return replace(cached)
             
-            # 获取合约价格（标记价格）
-            fapi_url = f"{self.FAPI_BASE_URL}/fapi/v1/ticker/price"
-            fapi_params = {"symbol": binance_symbol}
-            
-            fapi_response = self._get_session.get(fapi_url, params=fapi_params, timeout=15)
-            fapi_response.raise_for_status()
-            fapi_data = fapi_response.json()
-            contract_price = float(fapi_data.get('price', 0))
-            
-            # 获取现货价格作为参考
-            spot_url = f"{self.BASE_URL}/api/v3/ticker/price"
-            spot_params = {"symbol": binance_symbol}
-            
-            spot_response = self._get_session.get(spot_url, params=spot_params, timeout=15)
-            spot_response.raise_for_status()
-            spot_data = spot_response.json()
-            reference_price = float(spot_data.get('price', 0))
+            # premiumIndex 一次返回标记价格与指数价格（币安的现货加权指数），无需再请求现货
+            data = self._get_premium_index(binance_symbol)
+            contract_price = float(data['markPrice'])
+            reference_price = float(data['indexPrice'])
             
             # 计算基差
             basis = contract_price - reference_price
             basis_rate = (basis / reference_price * 100) if reference_price != 0 else 0.0
             
-            import time
-            timestamp = int(time.time())
+            timestamp = int(data['time']) // 1000 if data.get('time') else int(time.time())
             
             # 从交易对中提取基础货币
             # BTCUSDT -> BTC
             base_currency = binance_symbol.replace('USDT', '').replace('BUSD', '')
             
-            return ContractBasisData(
+            basis_data = ContractBasisData(
                 inst_id=symbol,
                 contract_type=contract_type or "perpetual",
                 basis=basis,
@@ -428,11 +821,13 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
                 tenor="perpetual",
                 quote_currency="USDT"
             )
+            _BASIS_CACHE.set(cache_key, basis_data)
+            return replace(basis_data)
             
-        except requests.exceptions.Timeout:
+        except TIMEOUT_ERRORS:
             logger.error("Binance 合约基差API 连接超时")
             raise PluginError("Binance 合约基差API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取合约基差失败: {e}")
             raise PluginError(f"Binance 合约基差API 网络错误: {e}")
         except Exception as e:
@@ -456,55 +851,42 @@ class BinanceMarketPlugin(MarketDataSourcePlugin):
             # 转换granularity到币安格式
             interval = self._convert_bar(granularity)
             
-            # 获取合约K线
-            contract_url = f"{self.FAPI_BASE_URL}/fapi/v1/klines"
+            # 获取合约K线（与现货请求并发）
+            contract_url = self._FAPI_KLINES_URL
             contract_params = {
                 "symbol": binance_symbol,
                 "interval": interval,
                 "limit": min(limit, 1000)
             }
             
-            contract_response = self._get_session.get(contract_url, params=contract_params, timeout=15)
-            contract_response.raise_for_status()
-            contract_klines = contract_response.json()
+            contract_future = _PAIR_EXECUTOR.submit(self._iter_json_array, contract_url, contract_params)
             
             # 获取现货K线
-            spot_url = f"{self.BASE_URL}/api/v3/klines"
+            spot_url = self._KLINES_URL
             spot_params = {
                 "symbol": binance_symbol,
                 "interval": interval,
                 "limit": min(limit, 1000)
             }
             
-            spot_response = self._get_session.get(spot_url, params=spot_params, timeout=15)
-            spot_response.raise_for_status()
-            spot_klines = spot_response.json()
-            
-            # 计算基差历史
-            history = []
-            for contract_k, spot_k in zip(contract_klines, spot_klines):
-                timestamp = int(contract_k[0]) // 1000
-                contract_close = float(contract_k[4])
-                spot_close = float(spot_k[4])
-                
-                basis = contract_close - spot_close
-                basis_rate = (basis / spot_close * 100) if spot_close != 0 else 0.0
-                
-                history.append({
-                    "timestamp": timestamp,
-                    "basis": basis,
-                    "basis_rate": basis_rate,
-                    "contract_price": contract_close,
-                    "spot_price": spot_close,
-                    "inst_id": binance_symbol
-                })
-            
-            return history
-            
-        except requests.exceptions.Timeout:
+            spot_klines = contract_klines = None
+            try:
+                spot_klines = self._iter_json_array(spot_url, spot_params)
+                contract_klines = contract_future.result()
+                # 计算基差历史（两组 K 线逐行配对，无需先完整解析）
+                return self._parse_basis_history(contract_klines, spot_klines, binance_symbol)
+            finally:
+                # 任一请求失败或配对提前结束时，两个流式响应都要关闭，连接才会归还连接池
+                if contract_klines is None and not contract_future.cancel():
+                    # 现货请求失败而合约请求已在执行：等它结束后再关闭其响应
+                    contract_future.add_done_callback(_close_future_stream)
+                _close_stream(spot_klines)
+                _close_stream(contract_klines)
+            
+        except TIMEOUT_ERRORS:
             logger.error("Binance 合约基差历史API 连接超时")
             raise PluginError("Binance 合约基差历史API 连接超时")
-        except requests.exceptions.RequestException as e:
+        except REQUEST_ERRORS as e:
             logger.error(f"Binance 获取合约基差历史失败: {e}")
             raise PluginError(f"Binance 合约基差历史API 网络错误: {e}")
         except Exception as e:
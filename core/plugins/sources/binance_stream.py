@@ -2,17 +2,23 @@
 """Binance 实时 K 线 WebSocket 管理器"""
 from __future__ import annotations
 
-import json
 import logging
+import random
 import threading
 import time
 from collections import deque
 from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
 from typing import Deque, Dict, List, Optional
 from urllib.parse import urlparse
 
 from core.proxy_config import get_proxy
-from ..base import CandleData
+from ..base import CandleData, Granularity
+from ._http import dumps_json, loads_json, orjson
+
+# 热路径上直接绑定底层解析函数，省去每条消息一次的包装调用
+_loads = orjson.loads if orjson is not None else loads_json
 
 try:  # pragma: no cover - 依赖在运行环境中安装
     import websocket  # type: ignore
@@ -22,12 +28,58 @@ except ImportError:  # pragma: no cover
 logger = logging.getLogger(__name__)
 
 
+# 预筛字段：开盘时间、收盘价、成交量
+_PREFILTER_KEYS = ('"t":', '"c":', '"v":')
+_PREFILTER_KEYS_BYTES = tuple(k.encode() for k in _PREFILTER_KEYS)
+
+
+def _raw_fields(message) -> Optional[tuple]:
+    """截取预筛字段值的原文（不做 JSON 解析），任一字段缺失时返回 None"""
+    if isinstance(message, str):
+        keys, sep = _PREFILTER_KEYS, ','
+    else:
+        keys, sep = _PREFILTER_KEYS_BYTES, b','
+    values = []
+    for key in keys:
+        i = message.find(key)
+        if i < 0:
+            return None
+        i += len(key)
+        j = message.find(sep, i)
+        if j < 0:
+            return None
+        values.append(message[i:j])
+    return tuple(values)
+
+
+def _raw_stream_name(message) -> Optional[str]:
+    """从组合流消息中截取 stream 名称（不做 JSON 解析）"""
+    if isinstance(message, str):
+        key, quote = '"stream":', '"'
+    else:
+        key, quote = b'"stream":', b'"'
+    i = message.find(key)
+    if i < 0:
+        return None
+    i = message.find(quote, i + len(key)) + 1
+    j = message.find(quote, i) if i > 0 else -1
+    if j < 0:
+        return None
+    name = message[i:j]
+    return name if isinstance(name, str) else name.decode()
+
+
 def _build_proxy_kwargs() -> Dict[str, object]:
     """构建 websocket-client 需要的代理参数"""
     proxy_url = get_proxy()
     if not proxy_url:
         return {}
+    return _parse_proxy(proxy_url)
+
 
+@lru_cache(maxsize=4)
+def _parse_proxy(proxy_url: str) -> Dict[str, object]:
+    """解析代理 URL（按 URL 缓存，返回值只读，勿修改）"""
     parsed = urlparse(proxy_url)
     if not parsed.hostname or not parsed.port:
         return {}
@@ -49,121 +101,275 @@ class _RealtimeStats:
     reconnects: int = 0
 
 
-class BinanceStreamWorker:
-    """单个 symbol@interval 的实时订阅"""
+class BinanceKlineBuffer:
+    """单个 symbol@interval 的实时 K 线缓冲区"""
 
     BUFFER_SIZE = 7200  # 约两小时的 1s K 线
+    STALE_AFTER = 10  # 超过该秒数没有推送，视为实时流已停滞
 
     def __init__(self, symbol: str, interval: str) -> None:
         self.symbol = symbol.lower()
         self.interval = interval
+        self.stream_name = f"{self.symbol}@kline_{self.interval}"
+        self._step = Granularity.to_seconds(interval) or 0  # 相邻 K 线开盘时间间隔（秒）
         self._buffer: Deque[CandleData] = deque(maxlen=self.BUFFER_SIZE)
-        self._buffer_lock = threading.Lock()
+        # 只有 WS 线程写缓冲区（单生产者），deque 的单次 append/下标赋值本身是原子的，
+        # 热路径无需加锁；该锁仅用于串行化 REST 回填
+        self._prime_lock = threading.Lock()
+        self._last_key: Optional[tuple] = None  # 上一条消息的 (开盘时间, 收盘价, 成交量) 原文
+        self.last_message_ts: float = 0
+
+    def reset(self) -> None:
+        """断线期间的 K 线缺失，清空缓冲区，等待下次 REST 回填"""
+        self._buffer.clear()
+        self._last_key = None
+        self.last_message_ts = 0
+
+    def feed(self, message) -> None:
+        """处理一条组合流推送（{"stream": ..., "data": {"k": ...}}）"""
+        try:
+            # 预筛：开盘时间、收盘价、成交量都没变的推送是重复数据，无需完整解析
+            key = _raw_fields(message)
+            if key is not None:
+                if key == self._last_key:
+                    self.last_message_ts = time.time()
+                    return
+                self._last_key = key
+
+            payload = _loads(message)
+            kline = (payload.get("data") or {}).get("k")
+            if not kline:
+                return
+
+            _float = float
+            candle = CandleData(
+                time=int(kline["t"]) // 1000,
+                open=_float(kline["o"]),
+                high=_float(kline["h"]),
+                low=_float(kline["l"]),
+                close=_float(kline["c"]),
+                volume=_float(kline["v"]),
+            )
+
+            # 缓冲区始终按时间升序：更新当前 K 线、追加新 K 线，迟到的旧消息直接丢弃
+            buffer = self._buffer
+            last_time = buffer[-1].time if buffer else None
+            if last_time == candle.time:
+                buffer[-1] = candle
+            elif last_time is None or candle.time > last_time:
+                if last_time is not None and candle.time - last_time > self._step:
+                    # 推送漏掉了 K 线，缺口之前的数据不再连续，从这一根重新开始
+                    buffer.clear()
+                buffer.append(candle)
+            self.last_message_ts = time.time()
+        except Exception as exc:  # pragma: no cover - 解析异常
+            logger.debug("忽略无效 WS 消息: %s", exc)
+
+    def prime(self, candles: List[CandleData]) -> bool:
+        """用 REST 历史 K 线回填实时数据之前的部分
+
+        只有 REST 数据与实时数据首尾相接（中间没有缺口）时才回填，返回是否可直接使用缓冲区；
+        尚无实时数据时不回填，避免把 REST 快照当成实时数据返回。
+        """
+        with self._prime_lock:
+            live = self._snapshot(self.BUFFER_SIZE)
+            if not candles or not live:
+                return False
+            first_live = live[0].time
+            if candles[-1].time + self._step < first_live:
+                return False
+            history = [c for c in candles if c.time < first_live]
+            if history:
+                merged = history + live
+                # 整体替换引用；替换瞬间 WS 线程写入旧缓冲区的那一条会在下一次推送时补上
+                self._buffer = deque(merged[-self.BUFFER_SIZE:], maxlen=self.BUFFER_SIZE)
+            return True
+
+    def _snapshot(self, limit: int) -> List[CandleData]:
+        """无锁读取缓冲区最新 limit 条（按时间升序）"""
+        while True:
+            buffer = self._buffer
+            try:
+                if limit >= len(buffer):
+                    return list(buffer)
+                # 从尾部反向取 limit 条，复制量与 limit 成正比而非整个缓冲区
+                data = list(islice(reversed(buffer), limit))
+            except RuntimeError:
+                # 读取期间被 WS 线程修改（仅在无 GIL 的解释器上可能发生），重读即可
+                continue
+            data.reverse()
+            return data
+
+    def get_latest(self, limit: int) -> List[CandleData]:
+        return self._snapshot(limit)
+
+    def is_live(self) -> bool:
+        """近期收到过推送（未停滞）"""
+        last = self.last_message_ts
+        return last > 0 and time.time() - last < self.STALE_AFTER
+
+
+class BinanceCombinedStream:
+    """单条 WebSocket 连接复用所有 symbol@interval 订阅（Binance 组合流）"""
+
+    WS_URL = "wss://stream.binance.com:9443/stream"
+    RECONNECT_MIN_DELAY = 1
+    RECONNECT_MAX_DELAY = 32
+
+    def __init__(self, proxy_kwargs: Optional[Dict[str, object]] = None) -> None:
+        self._buffers: Dict[str, BinanceKlineBuffer] = {}
+        self._ws = None  # 已建立的连接，未连接时为 None
+        self._request_id = 0
+        self._send_lock = threading.Lock()
         self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._run, daemon=True)
         self._stats = _RealtimeStats()
-        self._proxy_kwargs = _build_proxy_kwargs()
+        self._proxy_kwargs = _build_proxy_kwargs() if proxy_kwargs is None else proxy_kwargs
+        self._thread = threading.Thread(target=self._run, daemon=True)
         self._thread.start()
 
     @property
     def alive(self) -> bool:
         return self._thread.is_alive() and not self._stop_event.is_set()
 
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
     def stop(self) -> None:
         self._stop_event.set()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+
+    def get_buffer(self, stream_name: str) -> Optional[BinanceKlineBuffer]:
+        return self._buffers.get(stream_name)
+
+    def subscribe(self, symbol: str, interval: str) -> BinanceKlineBuffer:
+        """订阅 symbol@interval；连接已建立时发送 SUBSCRIBE，无需重连"""
+        buffer = BinanceKlineBuffer(symbol, interval)
+        existing = self._buffers.setdefault(buffer.stream_name, buffer)
+        if existing is buffer:
+            self._send_control("SUBSCRIBE", [buffer.stream_name])
+        return existing
+
+    def unsubscribe(self, symbol: str, interval: str) -> None:
+        stream_name = f"{symbol.lower()}@kline_{interval}"
+        if self._buffers.pop(stream_name, None) is not None:
+            self._send_control("UNSUBSCRIBE", [stream_name])
+
+    def _send_control(self, method: str, streams: List[str], ws=None) -> None:
+        ws = ws or self._ws
+        if ws is None or not streams:
+            return  # 尚未连接，建立连接后 _on_open 会统一订阅
+        with self._send_lock:
+            self._request_id += 1
+            payload = {"method": method, "params": streams, "id": self._request_id}
+        try:
+            ws.send(dumps_json(payload).decode())
+        except Exception as exc:  # pragma: no cover - 网络异常
+            logger.warning("Binance WS %s 发送失败: %s", method, exc)
 
     def _run(self) -> None:
         if websocket is None:
             logger.warning("websocket-client 未安装，Binance 实时流不可用")
             return
 
-        stream_name = f"{self.symbol}@kline_{self.interval}"
-        url = f"wss://stream.binance.com:9443/ws/{stream_name}"
-
+        # WebSocketApp 可重复调用 run_forever，断线重连时复用同一对象
+        ws = websocket.WebSocketApp(
+            self.WS_URL,
+            on_open=self._on_open,
+            on_message=self._on_message,
+            on_error=self._on_error,
+            on_close=self._on_close,
+        )
+        backoff = self.RECONNECT_MIN_DELAY
         while not self._stop_event.is_set():
+            last_message_ts = self._stats.last_message_ts
             try:
-                ws = websocket.WebSocketApp(
-                    url,
-                    on_message=self._on_message,
-                    on_error=self._on_error,
-                    on_close=self._on_close,
+                logger.info("🔌 Binance WS 连接: %d 个订阅", len(self._buffers))
+                ws.run_forever(
+                    ping_interval=20,
+                    ping_timeout=10,
+                    # Binance 推送是机器生成的 ASCII JSON，跳过逐帧 UTF-8 校验；
+                    # 此时文本帧不再解码为 str，而是以 bytes 原样交给 _on_message
+                    skip_utf8_validation=True,
+                    **self._proxy_kwargs,
                 )
-                logger.info("🔌 Binance WS 连接: %s", stream_name)
-                ws.run_forever(ping_interval=20, ping_timeout=10, **self._proxy_kwargs)
             except Exception as exc:  # pragma: no cover - 网络异常
                 logger.warning("Binance WS 连接异常，将重试: %s", exc)
             finally:
+                self._ws = None
                 self._stats.reconnects += 1
-                if not self._stop_event.is_set():
-                    time.sleep(5)
-
-    def _on_message(self, _ws, message: str) -> None:
-        try:
-            payload = json.loads(message)
-            kline = payload.get("k")
-            if not kline:
-                return
-
-            candle = CandleData(
-                time=int(kline.get("t", 0)) // 1000,
-                open=float(kline.get("o", 0)),
-                high=float(kline.get("h", 0)),
-                low=float(kline.get("l", 0)),
-                close=float(kline.get("c", 0)),
-                volume=float(kline.get("v", 0)),
-            )
-
-            with self._buffer_lock:
-                if self._buffer and self._buffer[-1].time == candle.time:
-                    self._buffer[-1] = candle
-                else:
-                    self._buffer.append(candle)
-            self._stats.last_message_ts = time.time()
-        except Exception as exc:  # pragma: no cover - 解析异常
-            logger.debug("忽略无效 WS 消息: %s", exc)
+                for buffer in list(self._buffers.values()):
+                    buffer.reset()
+            # 上一次连接收到过数据说明只是短暂断线，尽快重连；否则指数退避并加随机抖动
+            if self._stats.last_message_ts != last_message_ts:
+                backoff = self.RECONNECT_MIN_DELAY
+            self._stop_event.wait(backoff + random.random())
+            backoff = min(self.RECONNECT_MAX_DELAY, backoff * 2)
+
+    def _on_open(self, ws) -> None:
+        self._ws = ws
+        self._send_control("SUBSCRIBE", list(self._buffers), ws=ws)
+
+    def _on_message(self, _ws, message) -> None:
+        # message 通常为 bytes（见 run_forever 参数），预筛与 orjson 均直接处理字节串
+        # 按 stream 名称分发；SUBSCRIBE 等控制帧的响应没有 stream 字段，直接忽略
+        stream_name = _raw_stream_name(message)
+        buffer = self._buffers.get(stream_name) if stream_name else None
+        if buffer is not None:
+            buffer.feed(message)
+            self._stats.last_message_ts = buffer.last_message_ts
 
     def _on_error(self, _ws, error: Exception) -> None:  # pragma: no cover - 调试辅助
-        logger.warning("Binance WS 错误 (%s@%s): %s", self.symbol, self.interval, error)
+        logger.warning("Binance WS 错误: %s", error)
 
     def _on_close(self, _ws, *_args) -> None:  # pragma: no cover - 调试辅助
-        logger.info("Binance WS 已关闭 (%s@%s)", self.symbol, self.interval)
-
-    def get_latest(self, limit: int) -> List[CandleData]:
-        with self._buffer_lock:
-            if not self._buffer:
-                return []
-            data = list(self._buffer)[-limit:]
-        return data
+        logger.info("Binance WS 已关闭")
 
 
 class BinanceRealtimeStreamManager:
-    """管理 Binance 实时 WebSocket 订阅"""
+    """管理 Binance 实时 WebSocket 订阅（所有订阅共用一条组合流连接）"""
 
     def __init__(self) -> None:
-        self._streams: Dict[str, BinanceStreamWorker] = {}
+        self._connection: Optional[BinanceCombinedStream] = None
         self._lock = threading.Lock()
 
-    def _stream_key(self, symbol: str, interval: str) -> str:
-        return f"{symbol.lower()}::{interval}"
-
-    def _ensure_stream(self, symbol: str, interval: str) -> Optional[BinanceStreamWorker]:
+    def _get_connection(self) -> Optional[BinanceCombinedStream]:
         if websocket is None:
             return None
-
-        key = self._stream_key(symbol, interval)
         with self._lock:
-            worker = self._streams.get(key)
-            if worker and worker.alive:
-                return worker
-            worker = BinanceStreamWorker(symbol, interval)
-            self._streams[key] = worker
-            return worker
+            if self._connection is None or not self._connection.alive:
+                # 代理参数在管理器层面解析一次，传给唯一的组合流连接
+                self._connection = BinanceCombinedStream(_build_proxy_kwargs())
+            return self._connection
 
     def get_latest_candles(self, symbol: str, interval: str, limit: int = 200) -> List[CandleData]:
-        worker = self._ensure_stream(symbol, interval)
-        if not worker:
+        connection = self._get_connection()
+        if not connection:
             return []
-        return worker.get_latest(limit)
+        return connection.subscribe(symbol, interval).get_latest(limit)
+
+    def prime(self, symbol: str, interval: str, candles: List[CandleData]) -> bool:
+        """为已订阅的流回填历史 K 线，返回回填后缓冲区是否连续可用"""
+        connection = self._connection
+        if connection is None:
+            return False
+        buffer = connection.get_buffer(f"{symbol.lower()}@kline_{interval}")
+        return buffer is not None and buffer.prime(candles)
+
+    def is_live(self, symbol: str, interval: str) -> bool:
+        """连接已建立且该流近期有推送时，缓冲区中的数据才可直接使用"""
+        connection = self._connection
+        if connection is None or not connection.connected:
+            return False
+        buffer = connection.get_buffer(f"{symbol.lower()}@kline_{interval}")
+        return buffer is not None and buffer.is_live()
+
+    def unsubscribe(self, symbol: str, interval: str) -> None:
+        connection = self._connection
+        if connection is not None:
+            connection.unsubscribe(symbol, interval)
 
     @property
     def enabled(self) -> bool:
@@ -3,6 +3,9 @@
 Bybit 交易所数据源插件
 """
 
+from array import array
+from dataclasses import replace
+from itertools import islice
 from typing import List, Optional
 from datetime import datetime
 import logging
@@ -12,20 +15,75 @@ from ..base import (
     MarketDataSourcePlugin,
     DataSourceMetadata,
     Capability,
+    CandleBatch,
     CandleData,
     TickerData,
     SourceType,
     PluginError,
     SymbolMode,
 )
+from ._cache import TTLCache
+from ._http import decode_json, shared_session
 
 logger = logging.getLogger(__name__)
 
+# 合并 1 秒内（ticker_update_frequency）对同一交易对的重复行情请求
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=1.0)
+
+# 标准时间周期 -> Bybit interval（分钟数或特殊字符）
+_INTERVALS = {
+    "1m": "1", "3m": "3", "5m": "5", "15m": "15", "30m": "30",
+    "1h": "60", "2h": "120", "4h": "240", "6h": "360", "12h": "720",
+    "1d": "D", "1w": "W", "1M": "M"
+}
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_METADATA = DataSourceMetadata(
+    name="bybit",
+    display_name="Bybit 交易所",
+    description="全球领先的加密货币衍生品交易平台，提供永续合约、期货和现货交易，日交易量数十亿美元",
+    source_type=SourceType.EXCHANGE,
+    website="https://www.bybit.com",
+    api_base_url="https://api.bybit.com",
+    plugin_version="1.0.0",
+    author="GeneticGrid Team",
+    last_updated=datetime(2025, 12, 5),
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=False,  # Bybit 全球可直连
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=True,
+    candlestick_granularities=(
+        "1m", "3m", "5m", "15m", "30m",
+        "1h", "2h", "4h", "6h", "12h",
+        "1d", "1w", "1M"
+    ),
+    candlestick_limit=1000,  # Bybit 最多返回 1000 条
+    candlestick_max_history_days=None,
+    supports_ticker=True,
+    ticker_update_frequency=1,
+    supported_symbols=(),  # 动态获取
+    symbol_format="BTCUSDT",  # Bybit 格式
+    symbol_modes=(SymbolMode.SPOT.value,),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=False,
+    has_rate_limit=True,
+    rate_limit_per_minute=120,
+    supports_real_time=False,
+    supports_websocket=True,
+)
+
 
 class BybitMarketPlugin(MarketDataSourcePlugin):
     """Bybit 交易所数据源插件"""
     
     BASE_URL = "https://api.bybit.com"
+    # 公共行情接口按 IP 限频较宽松，多交易对批量查询时提高并发（不超过连接池大小）
+    MAX_CONCURRENT_REQUESTS = 16
     
     def __init__(self):
         self._session = None
@@ -33,68 +91,56 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取 Bybit 元数据"""
-        return DataSourceMetadata(
-            name="bybit",
-            display_name="Bybit 交易所",
-            description="全球领先的加密货币衍生品交易平台，提供永续合约、期货和现货交易，日交易量数十亿美元",
-            source_type=SourceType.EXCHANGE,
-            website="https://www.bybit.com",
-            api_base_url="https://api.bybit.com",
-            plugin_version="1.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 12, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=False,  # Bybit 全球可直连
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取 Bybit 能力"""
-        return Capability(
-            supports_candlesticks=True,
-            candlestick_granularities=[
-                "1m", "3m", "5m", "15m", "30m",
-                "1h", "2h", "4h", "6h", "12h",
-                "1d", "1w", "1M"
-            ],
-            candlestick_limit=1000,  # Bybit 最多返回 1000 条
-            candlestick_max_history_days=None,
-            supports_ticker=True,
-            ticker_update_frequency=1,
-            supported_symbols=[],  # 动态获取
-            symbol_format="BTCUSDT",  # Bybit 格式
-            symbol_modes=[SymbolMode.SPOT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=False,
-            has_rate_limit=True,
-            rate_limit_per_minute=120,
-            supports_real_time=False,
-            supports_websocket=True,
-        )
+        return _CAPABILITY
     
     @property
     def _get_session(self):
-        """获取 requests session"""
+        """获取 requests session（进程级共享连接池）"""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                'User-Agent': 'GeneticGrid/1.0'
-            })
+            self._session = shared_session()
         return self._session
     
-    def _convert_symbol(self, inst_id: str) -> str:
+    @staticmethod
+    def _convert_symbol(inst_id: str) -> str:
         """将标准格式转换为 Bybit 格式: BTC-USDT -> BTCUSDT"""
         return inst_id.replace("-", "")
     
     def _convert_bar(self, bar: str) -> str:
         """将时间周期转换为 Bybit 格式（分钟数或特殊字符）"""
-        mapping = {
-            "1m": "1", "3m": "3", "5m": "5", "15m": "15", "30m": "30",
-            "1h": "60", "2h": "120", "4h": "240", "6h": "360", "12h": "720",
-            "1d": "D", "1w": "W", "1M": "M"
-        }
-        return mapping.get(bar, "60")
+        return _INTERVALS.get(bar, "60")
+    
+    @staticmethod
+    def _parse_klines(kline_list: list) -> List[CandleData]:
+        """解析 Bybit K 线数组
+        
+        每行格式: [startTime(ms), open, high, low, close, volume, turnover]，
+        最新的在前，解析时顺带反转为时间升序。
+        """
+        # 按下标取字段，比 `t, o, ..., *_` 解包少创建一个尾部列表
+        _int, _float, _candle = int, float, CandleData
+        return [
+            _candle(_int(r[0]) // 1000, _float(r[1]), _float(r[2]), _float(r[3]), _float(r[4]), _float(r[5]))
+            for r in reversed(kline_list)
+        ]
+    
+    @staticmethod
+    def _parse_klines_batch(kline_list: list) -> CandleBatch:
+        """将 Bybit K 线数组直接解码为列式数据（时间升序）"""
+        if not kline_list:
+            return CandleBatch()
+        open_times, opens, highs, lows, closes, volumes = islice(zip(*reversed(kline_list)), 6)
+        return CandleBatch(
+            time=array('q', [int(t) // 1000 for t in open_times]),
+            open=array('d', map(float, opens)),
+            high=array('d', map(float, highs)),
+            low=array('d', map(float, lows)),
+            close=array('d', map(float, closes)),
+            volume=array('d', map(float, volumes)),
+        )
     
     def _get_candlesticks_impl(
         self,
@@ -105,6 +151,34 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
         mode: str = SymbolMode.SPOT.value,
     ) -> List[CandleData]:
         """获取 K线数据"""
+        return self._request_klines(symbol, bar, limit, before, mode, self._parse_klines)
+    
+    def get_candlesticks_batch(
+        self,
+        symbol: str,
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> CandleBatch:
+        """获取列式 K线数据，REST 结果直接解码为列，不创建 CandleData 对象
+        
+        需要聚合粒度时回退到基类实现。
+        """
+        mode = self._ensure_mode_supported(mode)
+        if bar not in _INTERVALS:
+            return super().get_candlesticks_batch(symbol, bar, limit, before, mode)
+        return self._request_klines(
+            self._normalize_symbol(symbol, mode),
+            bar,
+            self._clamp_limit(limit),
+            before,
+            mode,
+            self._parse_klines_batch,
+        )
+    
+    def _request_klines(self, symbol: str, bar: str, limit: int, before: Optional[int], mode: str, parse):
+        """请求 Bybit K 线并用 parse 解析原始数组"""
         try:
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("Bybit 插件暂不支持合约模式")
@@ -126,7 +200,7 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
             
             response = self._get_session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = decode_json(response)
             
             if data.get("retCode") != 0:
                 raise PluginError(f"Bybit API 错误: {data.get('retMsg', '未知错误')}")
@@ -138,19 +212,7 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
             if not kline_list:
                 raise PluginError("Bybit 返回数据为空")
             
-            candles = []
-            # Bybit 返回的数据是倒序的（最新的在前），需要反转
-            for item in reversed(kline_list):
-                candles.append(CandleData(
-                    time=int(item[0]) // 1000,  # 毫秒转秒
-                    open=float(item[1]),
-                    high=float(item[2]),
-                    low=float(item[3]),
-                    close=float(item[4]),
-                    volume=float(item[5]),
-                ))
-            
-            return candles
+            return parse(kline_list)
             
         except requests.exceptions.Timeout:
             logger.error("Bybit API 连接超时")
@@ -172,6 +234,10 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("Bybit 插件暂不支持合约模式")
             bybit_symbol = self._convert_symbol(symbol)
+            cached = _TICKER_CACHE.get(bybit_symbol)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             
             # Bybit V5 API - Tickers
             url = f"{self.BASE_URL}/v5/market/tickers"
@@ -182,7 +248,7 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
             
             response = self._get_session.get(url, params=params, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = decode_json(response)
             
             if data.get("retCode") != 0:
                 raise PluginError(f"Bybit API 错误: {data.get('retMsg', '未知错误')}")
@@ -205,7 +271,7 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
             change_24h = last_price - prev_price if prev_price else None
             change_24h_pct = (change_24h / prev_price * 100) if prev_price and change_24h else None
             
-            return TickerData(
+            ticker_data = TickerData(
                 inst_id=symbol,
                 last=last_price,
                 bid=float(ticker.get("bid1Price", 0)) or None,
@@ -215,6 +281,8 @@ class BybitMarketPlugin(MarketDataSourcePlugin):
                 change_24h=change_24h,
                 change_24h_pct=change_24h_pct,
             )
+            _TICKER_CACHE.set(bybit_symbol, ticker_data)
+            return replace(ticker_data)
             
         except requests.exceptions.Timeout:
             logger.error("Bybit API 连接超时")
@@ -3,6 +3,9 @@
 Coinbase 交易所数据源插件
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from dataclasses import replace
 from typing import List, Optional
 from datetime import datetime
 import logging
@@ -18,9 +21,66 @@ from ..base import (
     PluginError,
     SymbolMode,
 )
+from ._cache import TTLCache
+from ._http import shared_session
 
 logger = logging.getLogger(__name__)
 
+# 合并 1 秒内（ticker_update_frequency）对同一交易对的重复行情请求
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=1.0)
+
+# 标准时间周期 -> Coinbase granularity（秒）
+_GRANULARITIES = {
+    "1m": 60, "5m": 300, "15m": 900,
+    "1h": 3600, "1H": 3600,
+    "4h": 14400, "4H": 14400,
+    "1d": 86400, "1D": 86400,
+    "1w": 604800, "1W": 604800,
+}
+
+# 行情需要的 ticker/stats 两次请求并发发起（线程在首次提交时才创建）
+_PAIR_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='coinbase-pair')
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_METADATA = DataSourceMetadata(
+    name="coinbase",
+    display_name="Coinbase 交易所",
+    description="美国领先的数字资产交易平台，提供现货和期货交易，支持 100+ 种加密资产",
+    source_type=SourceType.EXCHANGE,
+    website="https://www.coinbase.com",
+    api_base_url="https://api.exchange.coinbase.com",
+    plugin_version="1.0.0",
+    author="GeneticGrid Team",
+    last_updated=datetime(2025, 1, 5),
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=False,  # Coinbase 全球可直连
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=True,
+    candlestick_granularities=(
+        "1m", "5m", "15m", "30m",
+        "1h", "2h", "6h",
+        "1d"
+    ),
+    candlestick_limit=350,
+    candlestick_max_history_days=None,
+    supports_ticker=True,
+    ticker_update_frequency=1,
+    supported_symbols=(),  # 动态获取
+    symbol_format="BASE-USD",  # Coinbase 格式
+    symbol_modes=(SymbolMode.SPOT.value,),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=False,  # Coinbase 全球可直连
+    has_rate_limit=True,
+    rate_limit_per_minute=10,
+    supports_real_time=False,
+    supports_websocket=True,
+)
+
 
 class CoinbaseMarketPlugin(MarketDataSourcePlugin):
     """Coinbase 交易所数据源插件
@@ -36,8 +96,9 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
         self._session = None
         super().__init__()
     
+    @staticmethod
+    @lru_cache(maxsize=256)
     def _normalize_symbol(
-        self,
         symbol: str,
         mode: str = SymbolMode.SPOT.value,
     ) -> str:
@@ -61,71 +122,48 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取 Coinbase 元数据"""
-        return DataSourceMetadata(
-            name="coinbase",
-            display_name="Coinbase 交易所",
-            description="美国领先的数字资产交易平台，提供现货和期货交易，支持 100+ 种加密资产",
-            source_type=SourceType.EXCHANGE,
-            website="https://www.coinbase.com",
-            api_base_url="https://api.exchange.coinbase.com",
-            plugin_version="1.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 1, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=False,  # Coinbase 全球可直连
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取 Coinbase 能力"""
-        return Capability(
-            supports_candlesticks=True,
-            candlestick_granularities=[
-                "1m", "5m", "15m", "30m",
-                "1h", "2h", "6h",
-                "1d"
-            ],
-            candlestick_limit=350,
-            candlestick_max_history_days=None,
-            supports_ticker=True,
-            ticker_update_frequency=1,
-            supported_symbols=[],  # 动态获取
-            symbol_format="BASE-USD",  # Coinbase 格式
-            symbol_modes=[SymbolMode.SPOT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=False,  # Coinbase 全球可直连
-            has_rate_limit=True,
-            rate_limit_per_minute=10,
-            supports_real_time=False,
-            supports_websocket=True,
-        )
+        return _CAPABILITY
     
     @property
     def _get_session(self):
-        """获取 requests session"""
+        """获取 requests session（进程级共享连接池）"""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                'User-Agent': 'GeneticGrid/1.0'
-            })
+            self._session = shared_session()
         return self._session
     
-    def _convert_symbol(self, inst_id: str) -> str:
+    def _get_json(self, url: str, params: Optional[dict] = None):
+        """发起 GET 请求并解析 JSON"""
+        response = self._get_session.get(url, params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    def _convert_symbol(inst_id: str) -> str:
         """将标准格式转换为 Coinbase 格式: BTC-USDT -> BTC-USD"""
         # Coinbase 使用 USD 而不是 USDT
         return inst_id.replace('USDT', 'USD')
     
     def _convert_bar(self, bar: str) -> int:
         """将时间周期转换为 Coinbase 格式（秒）"""
-        mapping = {
-            "1m": 60, "5m": 300, "15m": 900,
-            "1h": 3600, "1H": 3600,
-            "4h": 14400, "4H": 14400,
-            "1d": 86400, "1D": 86400,
-            "1w": 604800, "1W": 604800,
-        }
-        return mapping.get(bar, 3600)
+        return _GRANULARITIES.get(bar, 3600)
+    
+    @staticmethod
+    def _parse_candles(data: list) -> List[CandleData]:
+        """解析 Coinbase K 线数组
+        
+        每行格式: [time, low, high, open, close, volume]，最新的在前，
+        解析时顺带反转为时间升序。
+        """
+        # 按下标取字段，比 `t, l, ..., *_` 解包少创建一个尾部列表
+        _int, _float, _candle = int, float, CandleData
+        return [
+            _candle(_int(r[0]), _float(r[3]), _float(r[2]), _float(r[1]), _float(r[4]), _float(r[5]))
+            for r in reversed(data)
+        ]
     
     def _get_candlesticks_impl(
         self,
@@ -155,20 +193,7 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
             if not data:
                 raise PluginError("Coinbase 返回数据为空")
             
-            # Coinbase 返回格式: [[time, low, high, open, close, volume], ...]
-            # 数据是倒序的（最新的在前）
-            candles = []
-            for item in reversed(data[:limit]):
-                candles.append(CandleData(
-                    time=int(item[0]),  # Unix timestamp
-                    open=float(item[3]),
-                    high=float(item[2]),
-                    low=float(item[1]),
-                    close=float(item[4]),
-                    volume=float(item[5]),
-                ))
-            
-            return candles
+            return self._parse_candles(data[:limit])
             
         except requests.exceptions.Timeout:
             logger.error("Coinbase API 连接超时")
@@ -190,19 +215,18 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("Coinbase 插件仅支持现货模式")
             coinbase_symbol = self._convert_symbol(symbol)
+            cached = _TICKER_CACHE.get(coinbase_symbol)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             
-            # Coinbase Pro API - Ticker
+            # Coinbase Pro API - Ticker 与 24h 统计数据互不依赖，并发获取
             url = f"{self.BASE_URL}/products/{coinbase_symbol}/ticker"
-            
-            response = self._get_session.get(url, timeout=10)
-            response.raise_for_status()
-            ticker = response.json()
-            
-            # 获取 24h 统计数据
             stats_url = f"{self.BASE_URL}/products/{coinbase_symbol}/stats"
-            stats_response = self._get_session.get(stats_url, timeout=10)
-            stats_response.raise_for_status()
-            stats = stats_response.json()
+            
+            stats_future = _PAIR_EXECUTOR.submit(self._get_json, stats_url)
+            ticker = self._get_json(url)
+            stats = stats_future.result()
             
             last_price = float(ticker.get('price', 0))
             open_24h = float(stats.get('open', 0))
@@ -211,7 +235,7 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
             change_24h = last_price - open_24h if open_24h else None
             change_24h_pct = (change_24h / open_24h * 100) if open_24h and change_24h else None
             
-            return TickerData(
+            ticker_data = TickerData(
                 inst_id=symbol,
                 last=last_price,
                 bid=float(ticker.get('bid', 0)) or None,
@@ -221,6 +245,8 @@ class CoinbaseMarketPlugin(MarketDataSourcePlugin):
                 change_24h=change_24h,
                 change_24h_pct=change_24h_pct,
             )
+            _TICKER_CACHE.set(coinbase_symbol, ticker_data)
+            return replace(ticker_data)
             
         except requests.exceptions.Timeout:
             logger.error("Coinbase API 连接超时")
@@ -3,7 +3,9 @@
 CoinGecko 数据聚合器插件
 """
 
-from typing import List, Optional
+from functools import lru_cache
+from dataclasses import replace
+from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 import requests
@@ -18,9 +20,61 @@ from ..base import (
     PluginError,
     SymbolMode,
 )
+from ._cache import TTLCache
+from ._http import decode_json, shared_session
 
 logger = logging.getLogger(__name__)
 
+# 常见计价币种（按匹配优先级排列）
+_QUOTE_CURRENCIES = ('USDT', 'USDC', 'USD', 'BTC', 'ETH')
+
+# 行情每 60 秒更新一次（ticker_update_frequency），窗口内的重复请求直接复用
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=60.0)
+
+# /simple/price 的固定查询参数，只有 ids 随请求变化
+_TICKER_PARAMS = {
+    "vs_currencies": "usd",
+    "include_24hr_change": "true",
+    "include_24hr_vol": "true",
+}
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_METADATA = DataSourceMetadata(
+    name="coingecko",
+    display_name="CoinGecko 聚合器",
+    description="免费的加密资产数据聚合平台，汇聚全球多个交易所的实时数据和历史价格",
+    source_type=SourceType.AGGREGATOR,
+    website="https://www.coingecko.com",
+    api_base_url="https://api.coingecko.com/api/v3",
+    plugin_version="1.0.0",
+    author="GeneticGrid Team",
+    last_updated=datetime(2025, 1, 5),
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=False,  # CoinGecko 全球可直连
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=False,  # CoinGecko 不提供 K线数据
+    candlestick_granularities=(),
+    supports_ticker=True,
+    ticker_update_frequency=60,
+    supported_symbols=(
+        "BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT",
+        "ADAUSDT", "AVAXUSDT", "LINKUSDT", "BNBUSDT"
+    ),
+    symbol_format="BTCUSDT",  # 标准格式
+    symbol_modes=(SymbolMode.SPOT.value,),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=False,  # CoinGecko 全球可直连
+    has_rate_limit=True,
+    rate_limit_per_minute=50,
+    supports_real_time=False,
+    supports_websocket=False,
+)
+
 
 class CoinGeckoMarketPlugin(MarketDataSourcePlugin):
     """CoinGecko 数据聚合器插件
@@ -47,23 +101,35 @@ class CoinGeckoMarketPlugin(MarketDataSourcePlugin):
         "BNB": "binancecoin",
     }
     
+    # 预先展开 "基础币种 + 计价币种" -> coin_id，常见交易对一次字典查找即可完成转换
+    _SYMBOL_TO_COIN_ID = {
+        f"{base}{quote}": coin_id
+        for base, coin_id in COIN_ID_MAP.items()
+        for quote in _QUOTE_CURRENCIES
+    }
+    
     def __init__(self):
         self._session = None
         super().__init__()
     
+    @staticmethod
+    @lru_cache(maxsize=256)
     def _normalize_symbol(
-        self,
         symbol: str,
         mode: str = SymbolMode.SPOT.value,
     ) -> str:
-        """标准格式 "BTCUSDT" -> CoinGecko 格式 "bitcoin" """
+        """标准格式 "BTCUSDT" -> CoinGecko 格式 "bitcoin"（结果按原始输入缓存）"""
         symbol = symbol.upper().replace('-', '').replace('/', '')
+        coin_id_map = CoinGeckoMarketPlugin.COIN_ID_MAP
+        coin_id = CoinGeckoMarketPlugin._SYMBOL_TO_COIN_ID.get(symbol)
+        if coin_id:
+            return coin_id
         
         # 提取基础币种
-        for quote in ['USDT', 'USDC', 'USD', 'BTC', 'ETH']:
+        for quote in _QUOTE_CURRENCIES:
             if symbol.endswith(quote):
                 base = symbol[:-len(quote)]
-                coin_id = self.COIN_ID_MAP.get(base)
+                coin_id = coin_id_map.get(base)
                 if coin_id:
                     return coin_id
                 raise PluginError(f"不支持的币种: {base}")
@@ -71,7 +137,7 @@ class CoinGeckoMarketPlugin(MarketDataSourcePlugin):
         # 默认：假设后4位是计价币种
         if len(symbol) > 4:
             base = symbol[:-4]
-            coin_id = self.COIN_ID_MAP.get(base)
+            coin_id = coin_id_map.get(base)
             if coin_id:
                 return coin_id
         
@@ -79,53 +145,32 @@ class CoinGeckoMarketPlugin(MarketDataSourcePlugin):
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取 CoinGecko 元数据"""
-        return DataSourceMetadata(
-            name="coingecko",
-            display_name="CoinGecko 聚合器",
-            description="免费的加密资产数据聚合平台，汇聚全球多个交易所的实时数据和历史价格",
-            source_type=SourceType.AGGREGATOR,
-            website="https://www.coingecko.com",
-            api_base_url="https://api.coingecko.com/api/v3",
-            plugin_version="1.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 1, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=False,  # CoinGecko 全球可直连
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取 CoinGecko 能力"""
-        return Capability(
-            supports_candlesticks=False,  # CoinGecko 不提供 K线数据
-            candlestick_granularities=[],
-            supports_ticker=True,
-            ticker_update_frequency=60,
-            supported_symbols=[
-                "BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "DOGEUSDT",
-                "ADAUSDT", "AVAXUSDT", "LINKUSDT", "BNBUSDT"
-            ],
-            symbol_format="BTCUSDT",  # 标准格式
-            symbol_modes=[SymbolMode.SPOT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=False,  # CoinGecko 全球可直连
-            has_rate_limit=True,
-            rate_limit_per_minute=50,
-            supports_real_time=False,
-            supports_websocket=False,
-        )
+        return _CAPABILITY
     
     @property
     def _get_session(self):
-        """获取 requests session"""
+        """获取 requests session（进程级共享连接池）"""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                'User-Agent': 'GeneticGrid/1.0'
-            })
+            self._session = shared_session()
         return self._session
     
+    def _request(self, endpoint: str, params: dict, action: str) -> dict:
+        """请求 CoinGecko 接口并解析 JSON，网络错误统一转换为 PluginError"""
+        try:
+            response = self._get_session.get(f"{self.BASE_URL}/{endpoint}", params=params, timeout=10)
+            response.raise_for_status()
+            return decode_json(response)
+        except requests.exceptions.Timeout:
+            logger.error("CoinGecko API 连接超时")
+            raise PluginError("CoinGecko API 连接超时")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"CoinGecko {action}失败: {e}")
+            raise PluginError(f"CoinGecko {action}失败: {e}")
+    
     def _get_candlesticks_impl(
         self,
         coin_id: str,
@@ -143,52 +188,72 @@ class CoinGeckoMarketPlugin(MarketDataSourcePlugin):
         mode: str = SymbolMode.SPOT.value,
     ) -> TickerData:
         """获取行情数据的内部实现（coin_id 已转换为 bitcoin 等）"""
+        ticker = self._get_tickers_impl([coin_id], mode).get(coin_id)
+        if ticker is None:
+            raise PluginError(f"CoinGecko 未返回 {coin_id} 数据")
+        # 返回副本，调用方会改写 inst_id
+        return replace(ticker)
+    
+    def _get_tickers_impl(
+        self,
+        coin_ids: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """批量获取行情数据：/simple/price 支持逗号分隔的 ids，N 个币种只需一次请求
+        
+        命中缓存的币种不再请求；返回的对象可能来自缓存，调用方需自行复制。
+        """
         try:
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("CoinGecko 仅提供现货行情数据")
+            tickers: Dict[str, TickerData] = {}
+            missing = []
+            for coin_id in coin_ids:
+                cached = _TICKER_CACHE.get(coin_id)
+                if cached is not None:
+                    tickers[coin_id] = cached
+                else:
+                    missing.append(coin_id)
+            if not missing:
+                return tickers
+            
             # coin_id 已经通过 _normalize_symbol 转换了，直接使用
             # CoinGecko API - Simple Price
-            url = f"{self.BASE_URL}/simple/price"
-            params = {
-                "ids": coin_id,
-                "vs_currencies": "usd",
-                "include_24hr_change": "true",
-                "include_24hr_vol": "true",
-            }
+            params = {**_TICKER_PARAMS, "ids": ",".join(missing)}
             
-            response = self._get_session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if coin_id not in data:
-                raise PluginError(f"CoinGecko 未返回 {coin_id} 数据")
-            
-            coin_data = data[coin_id]
-            last_price = float(coin_data.get('usd', 0))
-            change_24h_pct = float(coin_data.get('usd_24h_change', 0)) or None
+            data = self._request("simple/price", params, "获取行情数据")
             
-            # 计算24h变化金额
-            change_24h = None
-            if change_24h_pct and last_price:
-                change_24h = last_price * (change_24h_pct / 100)
+            for coin_id in missing:
+                if coin_id in data:
+                    ticker = self._parse_ticker(coin_id, data[coin_id])
+                    _TICKER_CACHE.set(coin_id, ticker)
+                    tickers[coin_id] = ticker
+            return tickers
             
-            return TickerData(
-                inst_id=coin_id,
-                last=last_price,
-                bid=None,  # CoinGecko 不提供买卖价
-                ask=None,
-                high_24h=None,  # 简单接口不提供高低价
-                low_24h=None,
-                change_24h=change_24h,
-                change_24h_pct=change_24h_pct,
-            )
-            
-        except requests.exceptions.Timeout:
-            logger.error("CoinGecko API 连接超时")
-            raise PluginError("CoinGecko API 连接超时")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"CoinGecko 获取行情数据失败: {e}")
-            raise PluginError(f"CoinGecko 获取行情数据失败: {e}")
+        except PluginError:
+            raise
         except Exception as e:
             logger.error(f"CoinGecko 获取行情数据失败: {e}")
             raise PluginError(f"CoinGecko 获取行情数据失败: {e}")
+    
+    @staticmethod
+    def _parse_ticker(coin_id: str, coin_data: dict) -> TickerData:
+        """解析 /simple/price 中单个币种的数据"""
+        last_price = float(coin_data.get('usd', 0))
+        change_24h_pct = float(coin_data.get('usd_24h_change', 0)) or None
+        
+        # 计算24h变化金额
+        change_24h = None
+        if change_24h_pct and last_price:
+            change_24h = last_price * (change_24h_pct / 100)
+        
+        return TickerData(
+            inst_id=coin_id,
+            last=last_price,
+            bid=None,  # CoinGecko 不提供买卖价
+            ask=None,
+            high_24h=None,  # 简单接口不提供高低价
+            low_24h=None,
+            change_24h=change_24h,
+            change_24h_pct=change_24h_pct,
+        )
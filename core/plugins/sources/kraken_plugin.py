@@ -3,7 +3,11 @@
 Kraken 交易所数据源插件
 """
 
-from typing import List, Optional
+from array import array
+from dataclasses import replace
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 import requests
@@ -12,15 +16,68 @@ from ..base import (
     MarketDataSourcePlugin,
     DataSourceMetadata,
     Capability,
+    CandleBatch,
     CandleData,
     TickerData,
     SourceType,
     PluginError,
     SymbolMode,
 )
+from ._cache import TTLCache
+from ._http import decode_json, shared_session
 
 logger = logging.getLogger(__name__)
 
+# 合并 1 秒内（ticker_update_frequency）对同一交易对的重复行情请求
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=1.0)
+
+# 标准时间周期 -> Kraken interval（分钟数）
+_INTERVALS = {
+    "1m": 1, "5m": 5, "15m": 15, "30m": 30,
+    "1h": 60, "1H": 60, "4h": 240, "4H": 240,
+    "1d": 1440, "1D": 1440, "1w": 10080, "1W": 10080
+}
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_METADATA = DataSourceMetadata(
+    name="kraken",
+    display_name="Kraken 交易所",
+    description="成立于2011年的美国加密货币交易所，以安全性和合规性著称，支持50+加密货币交易",
+    source_type=SourceType.EXCHANGE,
+    website="https://www.kraken.com",
+    api_base_url="https://api.kraken.com/0/public",
+    plugin_version="1.0.0",
+    author="GeneticGrid Team",
+    last_updated=datetime(2025, 12, 5),
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=False,  # Kraken 全球可直连
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=True,
+    candlestick_granularities=(
+        "1m", "5m", "15m", "30m",
+        "1h", "4h",
+        "1d", "1w"
+    ),
+    candlestick_limit=720,  # Kraken 最多返回 720 条
+    candlestick_max_history_days=None,
+    supports_ticker=True,
+    ticker_update_frequency=1,
+    supported_symbols=(),  # 动态获取
+    symbol_format="XBTUSDT",  # Kraken 使用 XBT 代替 BTC
+    symbol_modes=(SymbolMode.SPOT.value,),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=False,
+    has_rate_limit=True,
+    rate_limit_per_minute=15,  # Kraken 公共API限制较严格
+    supports_real_time=False,
+    supports_websocket=True,
+)
+
 
 class KrakenMarketPlugin(MarketDataSourcePlugin):
     """Kraken 交易所数据源插件"""
@@ -33,71 +90,76 @@ class KrakenMarketPlugin(MarketDataSourcePlugin):
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取 Kraken 元数据"""
-        return DataSourceMetadata(
-            name="kraken",
-            display_name="Kraken 交易所",
-            description="成立于2011年的美国加密货币交易所，以安全性和合规性著称，支持50+加密货币交易",
-            source_type=SourceType.EXCHANGE,
-            website="https://www.kraken.com",
-            api_base_url="https://api.kraken.com/0/public",
-            plugin_version="1.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 12, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=False,  # Kraken 全球可直连
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取 Kraken 能力"""
-        return Capability(
-            supports_candlesticks=True,
-            candlestick_granularities=[
-                "1m", "5m", "15m", "30m",
-                "1h", "4h",
-                "1d", "1w"
-            ],
-            candlestick_limit=720,  # Kraken 最多返回 720 条
-            candlestick_max_history_days=None,
-            supports_ticker=True,
-            ticker_update_frequency=1,
-            supported_symbols=[],  # 动态获取
-            symbol_format="XBTUSDT",  # Kraken 使用 XBT 代替 BTC
-            symbol_modes=[SymbolMode.SPOT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=False,
-            has_rate_limit=True,
-            rate_limit_per_minute=15,  # Kraken 公共API限制较严格
-            supports_real_time=False,
-            supports_websocket=True,
-        )
+        return _CAPABILITY
     
     @property
     def _get_session(self):
-        """获取 requests session"""
+        """获取 requests session（进程级共享连接池）"""
         if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                'User-Agent': 'GeneticGrid/1.0'
-            })
+            self._session = shared_session()
         return self._session
     
-    def _convert_symbol(self, inst_id: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _convert_symbol(inst_id: str) -> str:
         """将标准格式转换为 Kraken 格式: BTC-USDT -> XBTUSDT"""
         # Kraken 使用 XBT 而不是 BTC
-        symbol = inst_id.replace("-", "")
-        symbol = symbol.replace("BTC", "XBT")
-        return symbol
+        return inst_id.replace("-", "").replace("BTC", "XBT")
     
     def _convert_bar(self, bar: str) -> int:
         """将时间周期转换为 Kraken 格式（分钟数）"""
-        mapping = {
-            "1m": 1, "5m": 5, "15m": 15, "30m": 30,
-            "1h": 60, "1H": 60, "4h": 240, "4H": 240,
-            "1d": 1440, "1D": 1440, "1w": 10080, "1W": 10080
-        }
-        return mapping.get(bar, 60)
+        return _INTERVALS.get(bar, 60)
+    
+    def _request(self, endpoint: str, params: dict, action: str) -> dict:
+        """请求 Kraken 公共接口并解析 JSON
+        
+        网络错误与接口返回的 error 统一转换为 PluginError。
+        """
+        try:
+            response = self._get_session.get(f"{self.BASE_URL}/{endpoint}", params=params, timeout=10)
+            response.raise_for_status()
+            data = decode_json(response)
+        except requests.exceptions.Timeout:
+            logger.error("Kraken API 连接超时")
+            raise PluginError("Kraken API 连接超时")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Kraken {action}失败: {e}")
+            raise PluginError(f"Kraken {action}失败: {e}")
+        
+        if data.get("error"):
+            raise PluginError(f"Kraken API 错误: {data['error']}")
+        return data
+    
+    @staticmethod
+    def _parse_ohlc(rows: list) -> List[CandleData]:
+        """解析 Kraken OHLC 数组
+        
+        每行格式: [time(秒), open, high, low, close, vwap, volume, count]，已按时间升序。
+        """
+        _int, _float, _candle = int, float, CandleData
+        return [
+            _candle(_int(r[0]), _float(r[1]), _float(r[2]), _float(r[3]), _float(r[4]), _float(r[6]))
+            for r in rows
+        ]
+    
+    @staticmethod
+    def _parse_ohlc_batch(rows: list) -> CandleBatch:
+        """将 Kraken OHLC 数组直接解码为列式数据（时间升序）"""
+        if not rows:
+            return CandleBatch()
+        times, opens, highs, lows, closes, _vwaps, volumes = islice(zip(*rows), 7)
+        return CandleBatch(
+            time=array('q', map(int, times)),
+            open=array('d', map(float, opens)),
+            high=array('d', map(float, highs)),
+            low=array('d', map(float, lows)),
+            close=array('d', map(float, closes)),
+            volume=array('d', map(float, volumes)),
+        )
     
     def _get_candlesticks_impl(
         self,
@@ -108,13 +170,40 @@ class KrakenMarketPlugin(MarketDataSourcePlugin):
         mode: str = SymbolMode.SPOT.value,
     ) -> List[CandleData]:
         """获取 K线数据"""
+        return self._request_ohlc(symbol, bar, limit, before, mode, self._parse_ohlc)
+    
+    def get_candlesticks_batch(
+        self,
+        symbol: str,
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> CandleBatch:
+        """获取列式 K线数据，REST 结果直接解码为列，不创建 CandleData 对象
+        
+        需要聚合粒度时回退到基类实现。
+        """
+        mode = self._ensure_mode_supported(mode)
+        if bar not in self._capability.candlestick_granularities:
+            return super().get_candlesticks_batch(symbol, bar, limit, before, mode)
+        return self._request_ohlc(
+            self._normalize_symbol(symbol, mode),
+            bar,
+            self._clamp_limit(limit),
+            before,
+            mode,
+            self._parse_ohlc_batch,
+        )
+    
+    def _request_ohlc(self, symbol: str, bar: str, limit: int, before: Optional[int], mode: str, parse):
+        """请求 Kraken OHLC 并用 parse 解析最近 limit 行原始数组"""
         try:
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("Kraken 插件仅支持现货模式")
             kraken_symbol = self._convert_symbol(symbol)
             interval = self._convert_bar(bar)
             
-            url = f"{self.BASE_URL}/OHLC"
             params = {
                 "pair": kraken_symbol,
                 "interval": interval,
@@ -124,39 +213,20 @@ class KrakenMarketPlugin(MarketDataSourcePlugin):
             if before:
                 params["since"] = before - (limit * interval * 60)
             
-            response = self._get_session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("error") and len(data["error"]) > 0:
-                raise PluginError(f"Kraken API 错误: {data['error']}")
+            data = self._request("OHLC", params, "获取 K线数据")
             
             # Kraken 返回格式: {pair: [[time, open, high, low, close, vwap, volume, count], ...]}
-            result_key = list(data.get("result", {}).keys())[0] if data.get("result") else None
-            if not result_key or result_key == "last":
+            result = data.get("result") or {}
+            result_key = next(iter(result), None)
+            if result_key in (None, "last"):
                 raise PluginError("Kraken 返回数据为空")
             
-            ohlc_data = data["result"][result_key]
+            ohlc_data = result[result_key]
             
-            candles = []
-            for item in ohlc_data[-limit:]:
-                candles.append(CandleData(
-                    time=int(item[0]),  # 已经是秒
-                    open=float(item[1]),
-                    high=float(item[2]),
-                    low=float(item[3]),
-                    close=float(item[4]),
-                    volume=float(item[6]),
-                ))
+            return parse(ohlc_data[-limit:])
             
-            return candles
-            
-        except requests.exceptions.Timeout:
-            logger.error("Kraken API 连接超时")
-            raise PluginError("Kraken API 连接超时")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Kraken 获取 K线数据失败: {e}")
-            raise PluginError(f"Kraken 获取 K线数据失败: {e}")
+        except PluginError:
+            raise
         except Exception as e:
             logger.error(f"Kraken 获取 K线数据失败: {e}")
             raise PluginError(f"Kraken 获取 K线数据失败: {e}")
@@ -171,48 +241,105 @@ class KrakenMarketPlugin(MarketDataSourcePlugin):
             if mode != SymbolMode.SPOT.value:
                 raise PluginError("Kraken 插件仅支持现货模式")
             kraken_symbol = self._convert_symbol(symbol)
+            cached = _TICKER_CACHE.get(kraken_symbol)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             
-            url = f"{self.BASE_URL}/Ticker"
-            params = {"pair": kraken_symbol}
+            data = self._request("Ticker", {"pair": kraken_symbol}, "获取行情数据")
             
-            response = self._get_session.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get("error") and len(data["error"]) > 0:
-                raise PluginError(f"Kraken API 错误: {data['error']}")
-            
-            # Kraken 返回格式: {pair: {a: [ask, ...], b: [bid, ...], c: [last, ...], h: [high, high24h], l: [low, low24h], o: open, ...}}
-            result_key = list(data.get("result", {}).keys())[0] if data.get("result") else None
-            if not result_key:
+            # Kraken 返回格式: {pair: {...}}，字段见 _parse_ticker
+            result = data.get("result") or {}
+            result_key = next(iter(result), None)
+            if result_key is None:
                 raise PluginError("Kraken 返回数据为空")
             
-            ticker = data["result"][result_key]
+            ticker_data = self._parse_ticker(symbol, result[result_key])
+            _TICKER_CACHE.set(kraken_symbol, ticker_data)
+            return replace(ticker_data)
             
-            last_price = float(ticker["c"][0])
-            open_price = float(ticker["o"])
+        except PluginError:
+            raise
+        except Exception as e:
+            logger.error(f"Kraken 获取行情数据失败: {e}")
+            raise PluginError(f"Kraken 获取行情数据失败: {e}")
+    
+    def _get_tickers_impl(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """批量获取行情数据
+        
+        Kraken 的 /Ticker 接受逗号分隔的多个 pair，多个交易对时合并为一次请求。
+        """
+        try:
+            if mode != SymbolMode.SPOT.value:
+                raise PluginError("Kraken 插件仅支持现货模式")
+            tickers: Dict[str, TickerData] = {}
+            wanted: Dict[str, str] = {}
+            for symbol in symbols:
+                kraken_symbol = self._convert_symbol(symbol)
+                cached = _TICKER_CACHE.get(kraken_symbol)
+                if cached is not None:
+                    # get_tickers 会为每个结果生成副本，这里可以直接返回缓存对象
+                    tickers[symbol] = cached
+                else:
+                    wanted[kraken_symbol] = symbol
+            if len(wanted) < 2:
+                tickers.update(super()._get_tickers_impl(list(wanted.values()), mode))
+                return tickers
             
-            # 计算24h涨跌
-            change_24h = last_price - open_price
-            change_24h_pct = (change_24h / open_price * 100) if open_price else None
+            data = self._request("Ticker", {"pair": ",".join(wanted)}, "批量获取行情数据")
             
-            return TickerData(
-                inst_id=symbol,
-                last=last_price,
-                bid=float(ticker["b"][0]) if ticker.get("b") else None,
-                ask=float(ticker["a"][0]) if ticker.get("a") else None,
-                high_24h=float(ticker["h"][1]) if ticker.get("h") else None,
-                low_24h=float(ticker["l"][1]) if ticker.get("l") else None,
-                change_24h=change_24h,
-                change_24h_pct=change_24h_pct,
-            )
+            for result_key, ticker in (data.get("result") or {}).items():
+                kraken_symbol = self._match_pair(result_key, wanted)
+                if kraken_symbol is not None:
+                    ticker_data = self._parse_ticker(wanted[kraken_symbol], ticker)
+                    _TICKER_CACHE.set(kraken_symbol, ticker_data)
+                    tickers[wanted[kraken_symbol]] = ticker_data
+            return tickers
             
-        except requests.exceptions.Timeout:
-            logger.error("Kraken API 连接超时")
-            raise PluginError("Kraken API 连接超时")
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Kraken 获取行情数据失败: {e}")
-            raise PluginError(f"Kraken 获取行情数据失败: {e}")
+        except PluginError:
+            raise
         except Exception as e:
-            logger.error(f"Kraken 获取行情数据失败: {e}")
-            raise PluginError(f"Kraken 获取行情数据失败: {e}")
+            logger.error(f"Kraken 批量获取行情数据失败: {e}")
+            raise PluginError(f"Kraken 批量获取行情数据失败: {e}")
+    
+    @staticmethod
+    def _match_pair(result_key: str, wanted: Dict[str, str]) -> Optional[str]:
+        """将返回结果的键对应回请求的 pair
+        
+        Kraken 对部分老交易对返回带资产前缀的名称，如 XBTUSD -> XXBTZUSD。
+        """
+        if result_key in wanted:
+            return result_key
+        if len(result_key) == 8 and result_key[0] in "XZ" and result_key[4] in "XZ":
+            short = result_key[1:4] + result_key[5:]
+            if short in wanted:
+                return short
+        return None
+    
+    @staticmethod
+    def _parse_ticker(symbol: str, ticker: dict) -> TickerData:
+        """解析 Kraken 行情数据
+        
+        格式: {a: [ask, ...], b: [bid, ...], c: [last, ...], h: [high, high24h], l: [low, low24h], o: open, ...}
+        """
+        last_price = float(ticker["c"][0])
+        open_price = float(ticker["o"])
+        
+        # 计算24h涨跌
+        change_24h = last_price - open_price
+        change_24h_pct = (change_24h / open_price * 100) if open_price else None
+        
+        return TickerData(
+            inst_id=symbol,
+            last=last_price,
+            bid=float(ticker["b"][0]) if ticker.get("b") else None,
+            ask=float(ticker["a"][0]) if ticker.get("a") else None,
+            high_24h=float(ticker["h"][1]) if ticker.get("h") else None,
+            low_24h=float(ticker["l"][1]) if ticker.get("l") else None,
+            change_24h=change_24h,
+            change_24h_pct=change_24h_pct,
+        )
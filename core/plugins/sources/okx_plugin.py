@@ -3,7 +3,11 @@
 OKX 交易所数据源插件 - 使用 REST API
 """
 
-from typing import List, Optional
+from array import array
+from dataclasses import replace
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional
 from datetime import datetime
 import logging
 import time
@@ -13,6 +17,7 @@ from ..base import (
     MarketDataSourcePlugin,
     DataSourceMetadata,
     Capability,
+    CandleBatch,
     CandleData,
     TickerData,
     FundingRateData,
@@ -21,10 +26,101 @@ from ..base import (
     PluginError,
     SymbolMode,
 )
+from core.proxy_config import get_proxy
+from ._cache import TTLCache
+from ._http import RateLimiter, decode_json, shared_session
 from .okx_stream import get_realtime_manager as get_okx_realtime_manager
 
 logger = logging.getLogger(__name__)
 
+# 合并 1 秒内（ticker_update_frequency）对同一交易对的重复行情请求
+_TICKER_CACHE = TTLCache(maxsize=512, ttl=1.0)
+
+# 公共行情接口按 IP 限制为每 2 秒 20 次，并发扇出时在客户端排队而不是触发 429
+_LIMITER = RateLimiter(20, 2)
+
+# 代理探测结果（含可用性检测）在 60 秒内复用，避免每次请求重新解析
+_PROXY_CACHE = TTLCache(maxsize=1, ttl=60.0)
+
+# 常见计价币种（按匹配优先级排列）
+_QUOTE_CURRENCIES = ('USDT', 'USDC', 'USD', 'BTC', 'ETH')
+
+# 标准时间周期 -> OKX bar
+_BARS = {
+    "tick": "1s",
+    "1s": "1s",
+    "1m": "1m", "3m": "3m", "5m": "5m", "15m": "15m", "30m": "30m",
+    "1h": "1H", "2h": "2H", "4h": "4H", "6h": "6H", "12h": "12H",
+    "1d": "1D", "3d": "3D", "1w": "1W", "1M": "1M",
+}
+
+
+@lru_cache(maxsize=512)
+def _format_inst_id(symbol: str) -> str:
+    """标准格式 "BTCUSDT" -> OKX 现货格式 "BTC-USDT"（结果按原始输入缓存）"""
+    symbol = symbol.upper().replace('-', '').replace('/', '')
+    for quote in _QUOTE_CURRENCIES:
+        if symbol.endswith(quote):
+            return f"{symbol[:-len(quote)]}-{quote}"
+    # 默认：假设后4位是计价币种
+    if len(symbol) > 4:
+        return f"{symbol[:-4]}-{symbol[-4:]}"
+    return symbol
+
+
+# 元数据与能力描述是冻结的 dataclass，在导入时构建一次，所有实例共享
+_METADATA = DataSourceMetadata(
+    name="okx",
+    display_name="OKX 交易所",
+    description="全球领先的数字资产交易平台，支持现货、期货、永续合约等多种交易产品",
+    source_type=SourceType.EXCHANGE,
+    website="https://www.okx.com",
+    api_base_url="https://www.okx.com/api/v5",
+    plugin_version="2.0.0",
+    author="GeneticGrid Team",
+    last_updated=datetime(2025, 12, 5),
+    is_active=True,
+    is_experimental=False,
+    requires_proxy=True,  # 使用代理更稳定
+)
+
+_CAPABILITY = Capability(
+    supports_candlesticks=True,
+    candlestick_granularities=(
+        "tick",
+        "1s",
+        "1m", "3m", "5m", "15m", "30m",
+        "1h", "2h", "4h", "6h", "12h",
+        "1d", "3d", "1w", "1M"
+    ),
+    candlestick_limit=300,
+    candlestick_max_history_days=None,  # 无限制
+    supports_ticker=True,
+    ticker_update_frequency=1,
+    supported_symbols=(
+        # 主流币对
+        "BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT",
+        "SOLUSDT", "DOGEUSDT", "DOTUSDT", "MATICUSDT", "LTCUSDT",
+        "AVAXUSDT", "LINKUSDT", "ATOMUSDT", "UNIUSDT", "ETCUSDT",
+        # 更多交易对可通过 OKX API 动态获取
+    ),
+    symbol_format="BTCUSDT",  # 标准格式
+    symbol_modes=(SymbolMode.SPOT.value, SymbolMode.CONTRACT.value),
+    requires_api_key=False,
+    requires_authentication=False,
+    requires_proxy=True,  # 使用代理更稳定
+    has_rate_limit=True,
+    rate_limit_per_minute=600,
+    supports_real_time=True,
+    supports_websocket=True,
+    supports_funding_rate=True,
+    funding_rate_interval_hours=8,
+    funding_rate_quote_currency=None,
+    supports_contract_basis=True,
+    contract_basis_types=("perpetual",),
+    contract_basis_tenors=("perpetual",),
+)
+
 
 class OKXMarketPlugin(MarketDataSourcePlugin):
     """OKX 交易所数据源插件 - 直接使用 REST API
@@ -35,10 +131,24 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
     """
     
     BASE_URL = "https://www.okx.com/api/v5"
+    # 多交易对 K 线并发请求数，实际速率由 _LIMITER 控制
+    MAX_CONCURRENT_REQUESTS = 16
+    # 批量行情达到该数量时改为一次拉取整个品种类型的行情再筛选。
+    # 全量 SPOT 行情约 700 条（数百 KB），按响应体积估算约抵 10 次并发的单交易对请求；
+    # 交易对更少时逐个请求更省流量与解析开销
+    BATCH_TICKERS_THRESHOLD = 10
     
     def __init__(self):
         self._realtime = get_okx_realtime_manager()
+        self._session = None
         super().__init__()
+    
+    @property
+    def _get_session(self):
+        """获取 requests session（进程级共享连接池）"""
+        if self._session is None:
+            self._session = shared_session()
+        return self._session
 
     def _get_realtime_candles(
         self,
@@ -75,21 +185,7 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
     ) -> str:
         """标准格式 "BTCUSDT" -> OKX 格式 "BTC-USDT" (合约附加 -SWAP)"""
         normalized_mode = (mode or SymbolMode.SPOT.value).lower()
-
-        # 解析交易对
-        symbol = symbol.upper().replace('-', '').replace('/', '')
-        formatted = symbol
-
-        # 常见计价币种
-        for quote in ['USDT', 'USDC', 'USD', 'BTC', 'ETH']:
-            if symbol.endswith(quote):
-                base = symbol[:-len(quote)]
-                formatted = f"{base}-{quote}"
-                break
-        else:
-            # 默认：假设后4位是计价币种
-            if len(symbol) > 4:
-                formatted = f"{symbol[:-4]}-{symbol[-4:]}"
+        formatted = _format_inst_id(symbol)
 
         if normalized_mode == SymbolMode.CONTRACT.value:
             return self._resolve_contract_inst_id(formatted)
@@ -97,14 +193,7 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
     
     def _normalize_granularity(self, bar: str) -> str:
         """标准格式 "1h" -> OKX 格式 "1H" """
-        mapping = {
-            "tick": "1s",
-            "1s": "1s",
-            "1m": "1m", "3m": "3m", "5m": "5m", "15m": "15m", "30m": "30m",
-            "1h": "1H", "2h": "2H", "4h": "4H", "6h": "6H", "12h": "12H",
-            "1d": "1D", "3d": "3D", "1w": "1W", "1M": "1M",
-        }
-        return mapping.get(bar, bar)
+        return _BARS.get(bar, bar)
     
     def _normalize_timestamp(self, timestamp: Optional[int]) -> Optional[int]:
         """秒 -> 毫秒"""
@@ -116,59 +205,11 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
     
     def _get_metadata(self) -> DataSourceMetadata:
         """获取 OKX 元数据"""
-        return DataSourceMetadata(
-            name="okx",
-            display_name="OKX 交易所",
-            description="全球领先的数字资产交易平台，支持现货、期货、永续合约等多种交易产品",
-            source_type=SourceType.EXCHANGE,
-            website="https://www.okx.com",
-            api_base_url=self.BASE_URL,
-            plugin_version="2.0.0",
-            author="GeneticGrid Team",
-            last_updated=datetime(2025, 12, 5),
-            is_active=True,
-            is_experimental=False,
-            requires_proxy=True,  # 使用代理更稳定
-        )
+        return _METADATA
     
     def _get_capability(self) -> Capability:
         """获取 OKX 能力"""
-        return Capability(
-            supports_candlesticks=True,
-            candlestick_granularities=[
-                "tick",
-                "1s",
-                "1m", "3m", "5m", "15m", "30m",
-                "1h", "2h", "4h", "6h", "12h",
-                "1d", "3d", "1w", "1M"
-            ],
-            candlestick_limit=300,
-            candlestick_max_history_days=None,  # 无限制
-            supports_ticker=True,
-            ticker_update_frequency=1,
-            supported_symbols=[
-                # 主流币对
-                "BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT",
-                "SOLUSDT", "DOGEUSDT", "DOTUSDT", "MATICUSDT", "LTCUSDT",
-                "AVAXUSDT", "LINKUSDT", "ATOMUSDT", "UNIUSDT", "ETCUSDT",
-                # 更多交易对可通过 OKX API 动态获取
-            ],
-            symbol_format="BTCUSDT",  # 标准格式
-            symbol_modes=[SymbolMode.SPOT.value, SymbolMode.CONTRACT.value],
-            requires_api_key=False,
-            requires_authentication=False,
-            requires_proxy=True,  # 使用代理更稳定
-            has_rate_limit=True,
-            rate_limit_per_minute=600,
-            supports_real_time=True,
-            supports_websocket=True,
-            supports_funding_rate=True,
-            funding_rate_interval_hours=8,
-            funding_rate_quote_currency=None,
-            supports_contract_basis=True,
-            contract_basis_types=["perpetual"],
-            contract_basis_tenors=["perpetual"],
-        )
+        return _CAPABILITY
 
     def _parse_quote_currency(self, inst_id: str) -> Optional[str]:
         parts = inst_id.split('-')
@@ -194,31 +235,30 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
         return self._normalize_granularity(bar)
     
     def _get_proxies(self) -> dict:
-        """获取代理配置"""
+        """获取代理配置（结果缓存 60 秒）"""
+        proxies = _PROXY_CACHE.get('proxies')
+        if proxies is not None:
+            return proxies
+        proxies = {}
         try:
-            from core.proxy_config import get_proxy
             proxy = get_proxy()
             if proxy:
-                return {'http': proxy, 'https': proxy}
+                proxies = {'http': proxy, 'https': proxy}
         except Exception as e:
             logger.warning(f"获取代理配置失败: {e}")
-        return {}
+        _PROXY_CACHE.set('proxies', proxies)
+        return proxies
     
     def _request(self, endpoint: str, params: dict = None, timeout: int = 30) -> dict:
         """发送 HTTP 请求到 OKX API"""
         url = f"{self.BASE_URL}{endpoint}"
         proxies = self._get_proxies()
         
+        _LIMITER.acquire()
         try:
-            response = requests.get(
-                url,
-                params=params,
-                proxies=proxies,
-                timeout=timeout,
-                headers={'Content-Type': 'application/json'}
-            )
+            response = self._get_session.get(url, params=params, proxies=proxies, timeout=timeout)
             response.raise_for_status()
-            return response.json()
+            return decode_json(response)
         except requests.exceptions.Timeout:
             raise PluginError(f"OKX API 请求超时（{timeout}秒）")
         except requests.exceptions.RequestException as e:
@@ -290,37 +330,7 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
                         )
                 return candles
 
-            params = {
-                "instId": inst_id,  # 已转换为 "BTC-USDT" 或带 SWAP 的格式
-                "bar": bar,        # 已转换为 "1H" 格式
-                "limit": str(min(limit, 300))
-            }
-            if before:
-                # before 参数用于获取历史数据，所以实际应该使用 OKX 的 after 参数
-                # before 参数已在 _normalize_timestamp 中转换为毫秒
-                params["after"] = str(before)
-            
-            result = self._request("/market/candles", params)
-            
-            if result.get("code") != "0":
-                raise PluginError(f"OKX API 错误: {result.get('msg', '未知错误')}")
-            
-            data = result.get("data", [])
-            if not data:
-                return []  # 返回空列表而不是抛出异常
-            
-            candles = []
-            # OKX 返回倒序数据（最新在前），我们反转为正序（最旧在前）
-            for item in reversed(data):
-                candles.append(CandleData(
-                    time=int(item[0]) // 1000,  # 毫秒转秒
-                    open=float(item[1]),
-                    high=float(item[2]),
-                    low=float(item[3]),
-                    close=float(item[4]),
-                    volume=float(item[5]),
-                ))
-            return candles
+            return self._request_candles(inst_id, bar, limit, before, self._parse_candles)
             
         except PluginError:
             raise
@@ -328,6 +338,86 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
             logger.error(f"OKX 获取 K线数据失败: {e}")
             raise PluginError(f"OKX 获取 K线数据失败: {str(e)}")
     
+    def get_candlesticks_batch(
+        self,
+        symbol: str,
+        bar: str,
+        limit: int = 100,
+        before: Optional[int] = None,
+        mode: str = SymbolMode.SPOT.value,
+    ) -> CandleBatch:
+        """获取列式 K线数据，REST 结果直接解码为列，不创建 CandleData 对象
+        
+        1s 实时数据与需要聚合的粒度回退到基类实现。
+        """
+        mode = self._ensure_mode_supported(mode)
+        if bar in {"tick", "1s"} or bar not in self._capability.candlestick_granularities:
+            return super().get_candlesticks_batch(symbol, bar, limit, before, mode)
+        inst_id = self._normalize_symbol(symbol, mode)
+        if mode == SymbolMode.CONTRACT.value:
+            inst_id = self._resolve_contract_inst_id(inst_id)
+        try:
+            return self._request_candles(
+                inst_id,
+                self._normalize_granularity(bar),
+                self._clamp_limit(limit),
+                self._normalize_timestamp(before),
+                self._parse_candles_batch,
+            )
+        except PluginError:
+            raise
+        except Exception as e:
+            logger.error(f"OKX 获取 K线数据失败: {e}")
+            raise PluginError(f"OKX 获取 K线数据失败: {str(e)}")
+    
+    def _request_candles(self, inst_id: str, bar: str, limit: int, before: Optional[int], parse):
+        """请求 OKX REST K 线并用 parse 解析原始数组（参数均已转换为 OKX 格式）"""
+        params = {
+            "instId": inst_id,  # 已转换为 "BTC-USDT" 或带 SWAP 的格式
+            "bar": bar,        # 已转换为 "1H" 格式
+            "limit": str(min(limit, 300))
+        }
+        if before:
+            # before 参数用于获取历史数据，所以实际应该使用 OKX 的 after 参数
+            # before 参数已在 _normalize_timestamp 中转换为毫秒
+            params["after"] = str(before)
+        
+        result = self._request("/market/candles", params)
+        
+        if result.get("code") != "0":
+            raise PluginError(f"OKX API 错误: {result.get('msg', '未知错误')}")
+        
+        # 无数据时返回空结果而不是抛出异常
+        return parse(result.get("data") or [])
+    
+    @staticmethod
+    def _parse_candles(data: list) -> List[CandleData]:
+        """解析 OKX K 线数组
+        
+        每行格式: [ts(ms), o, h, l, c, vol, volCcy, volCcyQuote, confirm]，
+        最新的在前，解析时顺带反转为时间升序。
+        """
+        _int, _float, _candle = int, float, CandleData
+        return [
+            _candle(_int(r[0]) // 1000, _float(r[1]), _float(r[2]), _float(r[3]), _float(r[4]), _float(r[5]))
+            for r in reversed(data)
+        ]
+    
+    @staticmethod
+    def _parse_candles_batch(data: list) -> CandleBatch:
+        """将 OKX K 线数组直接解码为列式数据（时间升序）"""
+        if not data:
+            return CandleBatch()
+        times, opens, highs, lows, closes, volumes = islice(zip(*reversed(data)), 6)
+        return CandleBatch(
+            time=array('q', [int(t) // 1000 for t in times]),
+            open=array('d', map(float, opens)),
+            high=array('d', map(float, highs)),
+            low=array('d', map(float, lows)),
+            close=array('d', map(float, closes)),
+            volume=array('d', map(float, volumes)),
+        )
+    
     def _get_ticker_impl(
         self,
         symbol: str,
@@ -343,6 +433,10 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
                 if mode == SymbolMode.CONTRACT.value
                 else symbol
             )
+            cached = _TICKER_CACHE.get(inst_id)
+            if cached is not None:
+                # 返回副本，调用方会改写 inst_id
+                return replace(cached)
             result = self._request("/market/ticker", {"instId": inst_id})
             
             if result.get("code") != "0":
@@ -352,27 +446,9 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
             if not data:
                 raise PluginError("OKX 返回数据为空")
             
-            ticker = data[0]
-            last = float(ticker.get('last', 0))
-            open_24h = float(ticker.get('open24h', 0))
-            volume_24h = float(ticker.get('vol24h', 0) or 0)
-            volume_24h = volume_24h if volume_24h > 0 else None
-        
-            # 计算24h涨跌
-            change_24h = last - open_24h if open_24h else None
-            change_24h_pct = (change_24h / open_24h * 100) if open_24h and change_24h else None
-            
-            return TickerData(
-                inst_id=symbol,
-                last=last,
-                bid=float(ticker.get('bidPx', 0)) or None,
-                ask=float(ticker.get('askPx', 0)) or None,
-                high_24h=float(ticker.get('high24h', 0)) or None,
-                low_24h=float(ticker.get('low24h', 0)) or None,
-                change_24h=change_24h,
-                change_24h_pct=change_24h_pct,
-                volume_24h=volume_24h,
-            )
+            ticker = self._parse_ticker(symbol, data[0])
+            _TICKER_CACHE.set(inst_id, ticker)
+            return replace(ticker)
             
         except PluginError:
             raise
@@ -380,6 +456,75 @@ class OKXMarketPlugin(MarketDataSourcePlugin):
             logger.error(f"OKX 获取行情数据失败: {e}")
             raise PluginError(f"OKX 获取行情数据失败: {str(e)}")
 
+    def _get_tickers_impl(
+        self,
+        symbols: List[str],
+        mode: str = SymbolMode.SPOT.value,
+    ) -> Dict[str, TickerData]:
+        """批量获取行情数据
+        
+        OKX 的 /market/tickers 一次返回同一品种类型（SPOT/SWAP）的全部行情，
+        多个交易对时用一次请求代替 N 次单独请求。
+        """
+        try:
+            is_contract = mode == SymbolMode.CONTRACT.value
+            tickers: Dict[str, TickerData] = {}
+            wanted: Dict[str, str] = {}
+            for symbol in symbols:
+                inst_id = self._resolve_contract_inst_id(symbol) if is_contract else symbol
+                cached = _TICKER_CACHE.get(inst_id)
+                if cached is not None:
+                    # get_tickers 会为每个结果生成副本，这里可以直接返回缓存对象
+                    tickers[symbol] = cached
+                else:
+                    wanted[inst_id] = symbol
+            if len(wanted) < self.BATCH_TICKERS_THRESHOLD:
+                tickers.update(super()._get_tickers_impl(list(wanted.values()), mode))
+                return tickers
+            
+            result = self._request("/market/tickers", {"instType": "SWAP" if is_contract else "SPOT"})
+            
+            if result.get("code") != "0":
+                raise PluginError(f"OKX API 错误: {result.get('msg', '未知错误')}")
+            
+            for item in result.get("data", []):
+                symbol = wanted.get(item.get("instId"))
+                if symbol is not None:
+                    ticker = self._parse_ticker(symbol, item)
+                    _TICKER_CACHE.set(item["instId"], ticker)
+                    tickers[symbol] = ticker
+            return tickers
+            
+        except PluginError:
+            raise
+        except Exception as e:
+            logger.error(f"OKX 批量获取行情数据失败: {e}")
+            raise PluginError(f"OKX 批量获取行情数据失败: {str(e)}")
+
+    @staticmethod
+    def _parse_ticker(symbol: str, ticker: dict) -> TickerData:
+        """解析 OKX 行情数据"""
+        last = float(ticker.get('last', 0))
+        open_24h = float(ticker.get('open24h', 0))
+        volume_24h = float(ticker.get('vol24h', 0) or 0)
+        volume_24h = volume_24h if volume_24h > 0 else None
+        
+        # 计算24h涨跌
+        change_24h = last - open_24h if open_24h else None
+        change_24h_pct = (change_24h / open_24h * 100) if open_24h and change_24h else None
+        
+        return TickerData(
+            inst_id=symbol,
+            last=last,
+            bid=float(ticker.get('bidPx', 0)) or None,
+            ask=float(ticker.get('askPx', 0)) or None,
+            high_24h=float(ticker.get('high24h', 0)) or None,
+            low_24h=float(ticker.get('low24h', 0)) or None,
+            change_24h=change_24h,
+            change_24h_pct=change_24h_pct,
+            volume_24h=volume_24h,
+        )
+
     def _get_funding_rate_impl(self, symbol: str) -> FundingRateData:
         """获取永续合约资金费率"""
         inst_id = self._resolve_contract_inst_id(symbol, "perpetual")
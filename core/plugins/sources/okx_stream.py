@@ -8,6 +8,7 @@ import threading
 import time
 from collections import deque
 from dataclasses import dataclass
+from itertools import islice
 from typing import Deque, Dict, List, Optional
 from urllib.parse import urlparse
 
@@ -197,9 +198,12 @@ class OKXStreamWorker:
 
     def get_latest(self, limit: int) -> List[CandleData]:
         with self._buffer_lock:
-            if not self._buffer:
-                return []
-            return list(self._buffer)[-limit:]
+            if limit >= len(self._buffer):
+                return list(self._buffer)
+            # 从尾部反向取 limit 条，复制量与 limit 成正比而非整个缓冲区
+            data = list(islice(reversed(self._buffer), limit))
+        data.reverse()
+        return data
 
 
 class OKXRealtimeStreamManager:
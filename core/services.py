@@ -420,8 +420,8 @@ def get_market_service(source: str = "binance"):
     logger.error(
         f"❌ get_market_service('{source}') 已废弃！\n"
         f"   请使用插件系统:\n"
-        f"   from core.plugins.manager import PluginManager\n"
-        f"   manager = PluginManager()\n"
+        f"   from core.plugins.manager import get_plugin_manager\n"
+        f"   manager = get_plugin_manager()\n"
         f"   plugin = manager.get_plugin('{source}')\n"
     )
     raise DeprecationWarning(
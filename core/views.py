@@ -568,13 +568,15 @@ def api_source_documentation(request):
         manager = get_plugin_manager()
         doc = DocumentationGenerator.generate_all_plugins_doc(manager)
         
-        return JsonResponse({
+        # 元数据/能力描述对象交给 serialize 转换并编码为字节串
+        body = DocumentationGenerator.serialize({
             'code': 0,
             'data': {
                 'markdown': doc,
-                'json': DocumentationGenerator.generate_capabilities_json(manager),
+                'json': DocumentationGenerator.generate_capabilities_payload(manager),
             }
         })
+        return HttpResponse(body, content_type='application/json')
     except Exception as e:
         logger.error(f"生成文档失败: {e}")
         return JsonResponse({
@@ -163,3 +163,9 @@ REDIS_CACHE_ENABLED = os.environ.get('REDIS_CACHE_ENABLED', 'true').lower() in (
 REDIS_CACHE_URL = os.environ.get('REDIS_CACHE_URL', 'redis://127.0.0.1:6379/0')
 REDIS_CACHE_TTL_SECONDS = int(os.environ.get('REDIS_CACHE_TTL_SECONDS', 86400))  # 默认1天
 REDIS_CACHE_MAX_ENTRIES = int(os.environ.get('REDIS_CACHE_MAX_ENTRIES', 5000))
+
+# 插件文件缓存目录（已收盘的历史 K 线等），默认使用用户缓存目录而非项目目录
+PLUGIN_CACHE_DIR = os.environ.get('PLUGIN_CACHE_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'geneticgrid',
+)
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""测试公共夹具"""
+
+import io
+import json
+
+import pytest
+
+
+class FakeResponse:
+    def __init__(self, payload, headers=None):
+        self._payload = payload
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+    @property
+    def content(self):
+        return json.dumps(self._payload).encode()
+
+    @property
+    def raw(self):
+        """stream=True 时按文件对象读取响应体"""
+        return io.BytesIO(self.content)
+
+    def iter_content(self, chunk_size=1):
+        content = self.content
+        for i in range(0, len(content), chunk_size):
+            yield content[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeSession:
+    """伪造的 requests session
+
+    给定 payload 时所有请求返回同一份数据；给定 routes 时按 URL 后缀返回预设数据。
+    response_headers 作为每个响应的 headers，responses 记录已返回的响应。
+    """
+
+    def __init__(self, payload=None, routes=None, response_headers=None):
+        self.payload = payload
+        self.routes = routes
+        self.response_headers = response_headers
+        self.calls = []
+        self.responses = []
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        self.calls.append((url, dict(params or {})))
+        response = FakeResponse(self._payload_for(url), self.response_headers)
+        self.responses.append(response)
+        return response
+
+    def _payload_for(self, url):
+        if self.routes is None:
+            return self.payload
+        for suffix, payload in self.routes.items():
+            if url.endswith(suffix):
+                return payload
+        raise AssertionError(f"unexpected url: {url}")
+
+
+@pytest.fixture
+def fake_session():
+    """为插件装上伪造 session，不访问网络
+
+    用法: session = fake_session(plugin, payload) 或 fake_session(plugin, routes={后缀: payload})，
+    可选 response_headers 指定响应头
+    """
+    def attach(plugin, payload=None, routes=None, response_headers=None):
+        plugin._session = FakeSession(payload, routes, response_headers)
+        return plugin._session
+    return attach
@@ -0,0 +1,403 @@
+# -*- coding: utf-8 -*-
+"""Binance 插件单元测试（使用伪造的 HTTP session，不访问网络）"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.base import CandleData, PluginError
+from core.plugins.sources import _cache, binance_plugin, binance_stream
+from core.plugins.sources._cache import FileCache
+from core.plugins.sources._http import RateLimiter, shared_session
+from core.plugins.sources.binance_plugin import BinanceMarketPlugin
+
+
+def _kline(open_time_ms: int, close: float):
+    return [open_time_ms, "1.0", "2.0", "0.5", str(close), "10.0"]
+
+
+class DisabledRealtime:
+    enabled = False
+
+
+def _make_plugin(monkeypatch, tmp_path, fake_session, payload):
+    monkeypatch.setattr(binance_plugin, "_KLINE_CACHE", FileCache("binance", str(tmp_path)))
+    monkeypatch.setattr(binance_plugin, "_KLINE_MEMORY_CACHE", binance_plugin.TTLCache(maxsize=8, ttl=60))
+    # 视为已完成权重限额校准，避免额外的 exchangeInfo 请求干扰调用计数
+    monkeypatch.setattr(binance_plugin, "_WEIGHT_LIMITS_LOADED", {
+        BinanceMarketPlugin._EXCHANGE_INFO_URL, BinanceMarketPlugin._FAPI_EXCHANGE_INFO_URL,
+    })
+    plugin = BinanceMarketPlugin()
+    session = fake_session(plugin, payload)
+    plugin._realtime = DisabledRealtime()
+    return plugin, session
+
+
+def test_historical_klines_are_served_from_file_cache(monkeypatch, tmp_path, fake_session):
+    payload = [_kline(1_600_000_000_000, 1.5), _kline(1_600_000_060_000, 1.6)]
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+
+    first = plugin._fetch_rest_candles("BTCUSDT", "1m", 2, before=1_600_000_120)
+    binance_plugin._KLINE_MEMORY_CACHE.clear()
+    second = plugin._fetch_rest_candles("BTCUSDT", "1m", 2, before=1_600_000_120)
+    third = plugin._fetch_rest_candles("BTCUSDT", "1m", 2, before=1_600_000_120)
+
+    assert len(session.calls) == 1
+    assert third == second
+    assert third[0] is not second[0]
+    assert [c.time for c in second] == [1_600_000_000, 1_600_000_060]
+    assert [c.close for c in first] == [c.close for c in second] == [1.5, 1.6]
+
+
+
+def test_file_cache_concurrent_writes_use_unique_temp_files(tmp_path):
+    cache = FileCache("binance", str(tmp_path))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda i: cache.set("key", [i], ttl=60), range(32)))
+
+    assert cache.get("key")[0] in range(32)
+    assert os.listdir(cache.directory) == ["key.json"]
+
+
+def test_file_cache_defaults_to_user_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(_cache, "django_settings", None)
+    monkeypatch.delenv("PLUGIN_CACHE_DIR", raising=False)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+
+    assert FileCache("binance").directory == os.path.join(str(tmp_path), "geneticgrid", "binance")
+
+def test_latest_klines_are_not_cached(monkeypatch, tmp_path, fake_session):
+    payload = [_kline(1_600_000_000_000, 1.5)]
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+
+    plugin._fetch_rest_candles("BTCUSDT", "1m", 1, before=None)
+    plugin._fetch_rest_candles("BTCUSDT", "1m", 1, before=None)
+
+    assert len(session.calls) == 2
+
+
+def test_ticker_reads_within_ttl_share_one_request(monkeypatch, tmp_path, fake_session):
+    payload = {"lastPrice": "100", "openPrice": "80", "bidPrice": "99", "askPrice": "101"}
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_TICKER_CACHE", binance_plugin.TTLCache(ttl=60))
+
+    first = plugin.get_ticker("BTC-USDT")
+    second = plugin.get_ticker("BTCUSDT")
+
+    assert len(session.calls) == 1
+    assert first is not second
+    assert first.inst_id == "BTC-USDT"
+    assert second.inst_id == "BTCUSDT"
+    assert second.change_24h_pct == 25.0
+
+
+def test_get_tickers_batches_uncached_symbols(monkeypatch, tmp_path, fake_session):
+    payload = [
+        {"symbol": "BTCUSDT", "lastPrice": "100", "openPrice": "80"},
+        {"symbol": "ETHUSDT", "lastPrice": "10", "openPrice": "8"},
+    ]
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_TICKER_CACHE", binance_plugin.TTLCache(ttl=60))
+
+    tickers = plugin.get_tickers(["BTCUSDT", "ETH-USDT"])
+    plugin.get_ticker("ETHUSDT")
+
+    assert len(session.calls) == 1
+    assert json.loads(session.calls[0][1]["symbols"]) == ["BTCUSDT", "ETHUSDT"]
+    assert tickers["ETH-USDT"].inst_id == "ETH-USDT"
+    assert tickers["BTCUSDT"].last == 100.0
+
+
+def test_high_used_weight_pauses_limiter(monkeypatch, tmp_path, fake_session):
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, [_kline(1_600_000_000_000, 1.5)])
+    session.response_headers = {"X-MBX-USED-WEIGHT-1M": "1190"}
+    limiter = RateLimiter(1200, 60)
+    monkeypatch.setattr(binance_plugin, "_SPOT_LIMITER", limiter)
+
+    plugin._fetch_rest_candles("BTCUSDT", "1m", 1, before=None)
+
+    assert limiter._paused_until > time.monotonic()
+
+
+def test_weight_limit_is_read_from_exchange_info(monkeypatch, tmp_path, fake_session):
+    payload = {"rateLimits": [
+        {"rateLimitType": "RAW_REQUESTS", "interval": "MINUTE", "intervalNum": 5, "limit": 61000},
+        {"rateLimitType": "REQUEST_WEIGHT", "interval": "MINUTE", "intervalNum": 1, "limit": 6000},
+    ]}
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_WEIGHT_LIMITS_LOADED", set())
+    limiter = RateLimiter(1200, 60)
+    monkeypatch.setattr(binance_plugin, "_SPOT_LIMITER", limiter)
+
+    plugin._get(plugin._PRICE_URL)
+    plugin._get(plugin._PRICE_URL)
+
+    assert limiter.capacity == 6000
+    assert [url for url, _ in session.calls] == [plugin._EXCHANGE_INFO_URL, plugin._PRICE_URL, plugin._PRICE_URL]
+
+
+def test_rate_limiter_rejects_weight_above_capacity():
+    limiter = RateLimiter(10, 60)
+    with pytest.raises(ValueError):
+        limiter.acquire(11)
+
+
+def test_concurrent_identical_kline_requests_share_one_call(monkeypatch, tmp_path, fake_session):
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, [_kline(1_600_000_000_000, 1.5)])
+    original_get = session.get
+
+    def slow_get(*args, **kwargs):
+        time.sleep(0.1)
+        return original_get(*args, **kwargs)
+
+    session.get = slow_get
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(
+            lambda _: plugin._fetch_rest_candles("BTCUSDT", "1m", 1, before=None), range(4)
+        ))
+
+    assert len(session.calls) == 1
+    assert all(r[0].close == 1.5 for r in results)
+    assert len({id(r[0]) for r in results}) == 4
+
+
+def test_get_last_price_uses_price_endpoint(monkeypatch, tmp_path, fake_session):
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, {"symbol": "BTCUSDT", "price": "101.5"})
+
+    assert plugin.get_last_price("BTC-USDT") == 101.5
+    assert session.calls == [(BinanceMarketPlugin._PRICE_URL, {"symbol": "BTCUSDT"})]
+
+
+def test_candlesticks_batch_decodes_straight_to_columns(monkeypatch, tmp_path, fake_session):
+    payload = [_kline(1_600_000_000_000, 1.5), _kline(1_600_000_060_000, 1.6)]
+    plugin, _ = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+
+    batch = plugin.get_candlesticks_batch("BTC-USDT", "1m", limit=2)
+
+    assert batch.to_candles() == plugin._parse_klines(payload)
+    assert batch.time.typecode == "q"
+
+
+def test_funding_rate_is_cached_between_calls(monkeypatch, tmp_path, fake_session):
+    payload = {"lastFundingRate": "0.0001", "markPrice": "101", "indexPrice": "100", "time": 1_600_000_000_000}
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_FUNDING_CACHE", binance_plugin.TTLCache(ttl=60))
+
+    first = plugin.get_funding_rate("BTCUSDT")
+    second = plugin.get_funding_rate("BTC-USDT")
+
+    assert len(session.calls) == 1
+    assert second.inst_id == "BTC-USDT"
+    assert first.funding_rate == second.funding_rate == 0.0001
+
+
+def test_contract_basis_uses_single_premium_index_call(monkeypatch, tmp_path, fake_session):
+    payload = {"markPrice": "101", "indexPrice": "100", "time": 1_600_000_000_000}
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_BASIS_CACHE", binance_plugin.TTLCache(ttl=60))
+
+    basis = plugin.get_contract_basis("BTCUSDT")
+
+    assert [url for url, _ in session.calls] == [BinanceMarketPlugin._FAPI_PREMIUM_INDEX_URL]
+    assert basis.basis == 1.0
+    assert basis.basis_rate == 1.0
+    assert basis.timestamp == 1_600_000_000
+
+
+
+class _ClosableRows:
+    """模拟流式解析的 K 线迭代器，记录是否已关闭"""
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._rows)
+
+    def close(self):
+        self.closed = True
+
+
+def test_basis_history_closes_both_streams(monkeypatch, tmp_path, fake_session):
+    plugin, _ = _make_plugin(monkeypatch, tmp_path, fake_session, [])
+    streams = {
+        plugin._KLINES_URL: _ClosableRows([_kline(1_600_000_000_000, 100)]),
+        plugin._FAPI_KLINES_URL: _ClosableRows([_kline(1_600_000_000_000, 101), _kline(1_600_000_060_000, 102)]),
+    }
+    monkeypatch.setattr(plugin, "_iter_json_array", lambda url, params=None: streams[url])
+
+    history = plugin.get_contract_basis_history("BTCUSDT", limit=2)
+
+    assert [row["basis"] for row in history] == [1.0]
+    assert all(stream.closed for stream in streams.values())
+
+
+def test_basis_history_closes_contract_stream_when_spot_fails(monkeypatch, tmp_path, fake_session):
+    plugin, _ = _make_plugin(monkeypatch, tmp_path, fake_session, [])
+    contract = _ClosableRows([])
+    contract_started = threading.Event()
+
+    def fake_iter(url, params=None):
+        if url == plugin._KLINES_URL:
+            # 等合约请求真正开始后再让现货请求失败（否则合约请求会被直接取消）
+            contract_started.wait(1)
+            raise requests.ConnectionError("boom")
+        contract_started.set()
+        return contract
+
+    monkeypatch.setattr(plugin, "_iter_json_array", fake_iter)
+
+    with pytest.raises(PluginError):
+        plugin.get_contract_basis_history("BTCUSDT", limit=2)
+
+    deadline = time.monotonic() + 1
+    while not contract.closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert contract.closed
+
+def test_parse_basis_history_pairs_rows():
+    contract = [_kline(1_600_000_000_000, 101.0), _kline(1_600_000_060_000, 102.0)]
+    spot = [_kline(1_600_000_000_000, 100.0), _kline(1_600_000_060_000, 100.0)]
+
+    history = BinanceMarketPlugin._parse_basis_history(contract, spot, "BTCUSDT")
+
+    assert [h["timestamp"] for h in history] == [1_600_000_000, 1_600_000_060]
+    assert [h["basis_rate"] for h in history] == [1.0, 2.0]
+
+
+def test_batch_ticker_charges_per_symbol_weight(monkeypatch, tmp_path, fake_session):
+    payload = [{"symbol": s, "lastPrice": "1", "openPrice": "1"} for s in ("BTCUSDT", "ETHUSDT", "SOLUSDT")]
+    plugin, _ = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    monkeypatch.setattr(binance_plugin, "_TICKER_CACHE", binance_plugin.TTLCache(ttl=60))
+    limiter = RateLimiter(1200, 60)
+    monkeypatch.setattr(binance_plugin, "_SPOT_LIMITER", limiter)
+
+    plugin.get_tickers(["BTCUSDT", "ETHUSDT", "SOLUSDT"])
+
+    assert 1193 <= limiter._tokens <= 1195
+
+
+def _ws_message(open_ms, close, volume="1.0", stream="btcusdt@kline_1s"):
+    kline = {"t": open_ms, "T": open_ms + 999, "s": "BTCUSDT", "o": "1", "c": close,
+             "h": "2", "l": "0.5", "v": volume, "x": False}
+    data = {"e": "kline", "E": open_ms, "s": "BTCUSDT", "k": kline}
+    return json.dumps({"stream": stream, "data": data})
+
+
+def test_kline_buffer_skips_duplicate_ticks(monkeypatch):
+    parsed = []
+    monkeypatch.setattr(binance_stream, "_loads", lambda m: parsed.append(m) or json.loads(m))
+    buffer = binance_stream.BinanceKlineBuffer("BTCUSDT", "1s")
+
+    for message in (
+        _ws_message(1_600_000_000_000, "100"),
+        _ws_message(1_600_000_000_000, "100"),
+        _ws_message(1_600_000_000_000, "101").encode(),
+        _ws_message(1_600_000_001_000, "101"),
+        _ws_message(1_599_999_999_000, "99"),  # 迟到的旧消息
+    ):
+        buffer.feed(message)
+
+    assert len(parsed) == 4
+    assert [(c.time, c.close) for c in buffer.get_latest(10)] == [(1_600_000_000, 101.0), (1_600_000_001, 101.0)]
+
+
+def test_combined_stream_dispatches_by_stream_name(monkeypatch):
+    monkeypatch.setattr(binance_stream, "websocket", None)
+    connection = binance_stream.BinanceCombinedStream()
+    # 后台线程可能在 monkeypatch 还原后才运行，先停止以免真正发起连接
+    connection.stop()
+    btc = connection.subscribe("BTCUSDT", "1s")
+    eth = connection.subscribe("ETHUSDT", "1m")
+    assert connection.subscribe("btcusdt", "1s") is btc
+
+    connection._on_message(None, _ws_message(1_600_000_000_000, "100"))
+    connection._on_message(None, _ws_message(1_600_000_000_000, "5", stream="ethusdt@kline_1m"))
+    connection._on_message(None, '{"result":null,"id":1}')
+
+    assert [c.close for c in btc.get_latest(10)] == [100.0]
+    assert [c.close for c in eth.get_latest(10)] == [5.0]
+
+
+
+def _silent_realtime(monkeypatch):
+    """已订阅但从未收到推送的实时流（连接未建立）"""
+    monkeypatch.setattr(binance_stream, "websocket", None)
+    connection = binance_stream.BinanceCombinedStream()
+    connection.stop()
+    monkeypatch.setattr(binance_stream, "websocket", object())
+    manager = binance_stream.BinanceRealtimeStreamManager()
+    manager._connection = connection
+    manager._get_connection = lambda: connection
+    return manager
+
+
+def test_silent_stream_does_not_serve_stale_rest_snapshot(monkeypatch, tmp_path, fake_session):
+    payload = [_kline(1_600_000_000_000 + i * 1000, 1.0 + i) for i in range(3)]
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    plugin._realtime = _silent_realtime(monkeypatch)
+
+    first = plugin._get_candlesticks_impl("BTCUSDT", "1s", 3, None, "spot")
+    second = plugin._get_candlesticks_impl("BTCUSDT", "1s", 3, None, "spot")
+
+    assert len(session.calls) == 2
+    assert [c.close for c in first] == [c.close for c in second] == [1.0, 2.0, 3.0]
+
+
+def test_kline_buffer_prime_requires_contiguous_history():
+    buffer = binance_stream.BinanceKlineBuffer("BTCUSDT", "1s")
+    rest = [CandleData(1_600_000_000 + i, 1, 1, 1, 1.0, 1) for i in range(5)]
+    assert buffer.prime(rest) is False  # 尚无实时数据
+    assert buffer.get_latest(10) == []
+
+    buffer.feed(_ws_message(1_600_000_010_000, "2"))
+    assert buffer.prime(rest) is False  # REST 止于 ...04，实时从 ...10 开始，中间有缺口
+    assert [c.time for c in buffer.get_latest(10)] == [1_600_000_010]
+
+    rest += [CandleData(1_600_000_000 + i, 1, 1, 1, 1.0, 1) for i in range(5, 10)]
+    assert buffer.prime(rest) is True
+    assert [c.time for c in buffer.get_latest(20)] == list(range(1_600_000_000, 1_600_000_011))
+
+    buffer.feed(_ws_message(1_600_000_013_000, "3"))  # 推送漏掉两根
+    assert [c.time for c in buffer.get_latest(20)] == [1_600_000_013]
+
+
+def test_rest_gap_before_live_data_returns_rest_only(monkeypatch, tmp_path, fake_session):
+    payload = [_kline(1_600_000_000_000 + i * 1000, 1.0) for i in range(3)]
+    plugin, session = _make_plugin(monkeypatch, tmp_path, fake_session, payload)
+    manager = _silent_realtime(monkeypatch)
+    connection = manager._connection
+    connection._ws = object()  # 视为已连接
+    connection.subscribe("BTCUSDT", "1s")
+    connection._on_message(None, _ws_message(int(time.time()) * 1000, "2"))
+    plugin._realtime = manager
+
+    first = plugin._get_candlesticks_impl("BTCUSDT", "1s", 3, None, "spot")
+    second = plugin._get_candlesticks_impl("BTCUSDT", "1s", 3, None, "spot")
+
+    assert len(session.calls) == 2
+    assert [c.time for c in first] == [c.time for c in second] == [1_600_000_000, 1_600_000_001, 1_600_000_002]
+
+def test_binance_uses_its_own_pooled_session():
+    session = shared_session(binance_plugin._SESSION_NAME, **binance_plugin._SESSION_OPTIONS)
+    try:
+        adapter = session.get_adapter("https://api.binance.com")
+
+        assert session is not shared_session()
+        assert session.headers["User-Agent"] == "GeneticGrid/2.0"
+        assert adapter._pool_maxsize == 64
+        assert 429 in adapter.max_retries.status_forcelist
+    finally:
+        binance_plugin.close_shared_session()
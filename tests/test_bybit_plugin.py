@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Bybit 插件单元测试（使用伪造的 HTTP session，不访问网络）"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.sources.bybit_plugin import BybitMarketPlugin
+
+
+def test_candlesticks_are_returned_in_ascending_order(fake_session):
+    rows = [
+        ["1600000060000", "2", "4", "1", "3", "10", "30"],
+        ["1600000000000", "1", "2.5", "0.5", "2", "5", "10"],
+    ]
+    plugin = BybitMarketPlugin()
+    session = fake_session(plugin, {"retCode": 0, "result": {"list": rows}})
+
+    candles = plugin.get_candlesticks("BTCUSDT", "1m", limit=2)
+
+    assert session.calls[0][1]["interval"] == "1"
+    assert [(c.time, c.open, c.close, c.volume) for c in candles] == [
+        (1_600_000_000, 1.0, 2.0, 5.0),
+        (1_600_000_060, 2.0, 3.0, 10.0),
+    ]
+
+
+def test_candlesticks_batch_decodes_columns_directly(fake_session):
+    rows = [
+        ["1600000060000", "2", "4", "1", "3", "10", "30"],
+        ["1600000000000", "1", "2.5", "0.5", "2", "5", "10"],
+    ]
+    plugin = BybitMarketPlugin()
+    fake_session(plugin, {"retCode": 0, "result": {"list": rows}})
+
+    batch = plugin.get_candlesticks_batch("BTCUSDT", "1m", limit=2)
+
+    assert list(batch.time) == [1_600_000_000, 1_600_000_060]
+    assert list(batch.close) == [2.0, 3.0]
+    assert batch.to_candles() == plugin.get_candlesticks("BTCUSDT", "1m", limit=2)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Coinbase 插件单元测试（使用伪造的 HTTP session，不访问网络）"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.sources import coinbase_plugin
+from core.plugins.sources._cache import TTLCache
+from core.plugins.sources.coinbase_plugin import CoinbaseMarketPlugin
+
+
+def test_ticker_fetches_ticker_and_stats(monkeypatch, fake_session):
+    monkeypatch.setattr(coinbase_plugin, "_TICKER_CACHE", TTLCache(ttl=60))
+    plugin = CoinbaseMarketPlugin()
+    session = fake_session(plugin, routes={
+        "/ticker": {"price": "110", "bid": "109", "ask": "111"},
+        "/stats": {"open": "100", "high": "120", "low": "90"},
+    })
+
+    ticker = plugin.get_ticker("BTCUSDT")
+
+    assert sorted(url.rsplit("/", 1)[-1] for url, _ in session.calls) == ["stats", "ticker"]
+    assert ticker.last == 110.0
+    assert ticker.high_24h == 120.0
+    assert ticker.change_24h == 10.0
+    assert ticker.change_24h_pct == 10.0
+
+    again = plugin.get_ticker("BTCUSDT")
+    assert len(session.calls) == 2
+    assert again == ticker and again is not ticker
+
+
+def test_parse_candles_reorders_columns_and_reverses():
+    rows = [[1_600_000_060, 1.0, 4.0, 2.0, 3.0, 10.0], [1_600_000_000, 0.5, 2.5, 1.0, 2.0, 5.0]]
+
+    candles = CoinbaseMarketPlugin._parse_candles(rows)
+
+    assert [(c.time, c.open, c.high, c.low, c.close, c.volume) for c in candles] == [
+        (1_600_000_000, 1.0, 2.5, 0.5, 2.0, 5.0),
+        (1_600_000_060, 2.0, 4.0, 1.0, 3.0, 10.0),
+    ]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""CoinGecko 插件单元测试（使用伪造的 HTTP session，不访问网络）"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.base import PluginError
+from core.plugins.sources import coingecko_plugin
+from core.plugins.sources._cache import TTLCache
+from core.plugins.sources.coingecko_plugin import CoinGeckoMarketPlugin
+
+
+def _make_plugin(monkeypatch, fake_session, payload):
+    monkeypatch.setattr(coingecko_plugin, "_TICKER_CACHE", TTLCache(ttl=60))
+    plugin = CoinGeckoMarketPlugin()
+    return plugin, fake_session(plugin, payload)
+
+
+def test_get_tickers_joins_ids_into_one_request(monkeypatch, fake_session):
+    plugin, session = _make_plugin(monkeypatch, fake_session, {
+        "bitcoin": {"usd": 100.0, "usd_24h_change": 10.0},
+        "ethereum": {"usd": 50.0, "usd_24h_change": 0},
+    })
+
+    tickers = plugin.get_tickers(["BTCUSDT", "ETHUSDT", "BTC-USDT"])
+
+    assert len(session.calls) == 1
+    assert session.calls[0][1]["ids"] == "bitcoin,ethereum"
+    assert tickers["BTCUSDT"].last == 100.0
+    assert tickers["BTCUSDT"].change_24h == 10.0
+    assert tickers["BTC-USDT"].inst_id == "BTC-USDT"
+    assert tickers["ETHUSDT"].change_24h_pct is None
+
+    plugin.get_tickers(["ETHUSDT", "BTCUSDT"])
+    assert len(session.calls) == 1
+
+
+def test_get_ticker_raises_when_coin_missing(monkeypatch, fake_session):
+    plugin, _ = _make_plugin(monkeypatch, fake_session, {})
+
+    with pytest.raises(PluginError):
+        plugin.get_ticker("BTCUSDT")
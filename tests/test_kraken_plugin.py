@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Kraken 插件单元测试（使用伪造的 HTTP session，不访问网络）"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.sources import kraken_plugin
+from core.plugins.sources._cache import TTLCache
+from core.plugins.sources.kraken_plugin import KrakenMarketPlugin
+
+
+def test_candlesticks_take_volume_column_and_limit(fake_session):
+    rows = [
+        [1_600_000_000, "1", "2", "0.5", "1.5", "1.2", "10", 3],
+        [1_600_000_060, "1.5", "3", "1", "2.5", "2.0", "20", 5],
+        [1_600_000_120, "2.5", "4", "2", "3.5", "3.0", "30", 7],
+    ]
+    plugin = KrakenMarketPlugin()
+    session = fake_session(plugin, {"error": [], "result": {"XXBTZUSD": rows, "last": 1_600_000_120}})
+
+    candles = plugin.get_candlesticks("BTCUSD", "1m", limit=2)
+
+    assert session.calls[0][1] == {"pair": "XBTUSD", "interval": 1}
+    assert [(c.time, c.open, c.close, c.volume) for c in candles] == [
+        (1_600_000_060, 1.5, 2.5, 20.0),
+        (1_600_000_120, 2.5, 3.5, 30.0),
+    ]
+
+
+def test_candlesticks_batch_decodes_columns_directly(fake_session):
+    rows = [
+        [1_600_000_000, "1", "2", "0.5", "1.5", "1.2", "10", 3],
+        [1_600_000_060, "1.5", "3", "1", "2.5", "2.0", "20", 5],
+    ]
+    plugin = KrakenMarketPlugin()
+    fake_session(plugin, {"error": [], "result": {"XXBTZUSD": rows, "last": 1_600_000_060}})
+
+    batch = plugin.get_candlesticks_batch("BTCUSD", "1m", limit=2)
+
+    assert list(batch.time) == [1_600_000_000, 1_600_000_060]
+    assert list(batch.volume) == [10.0, 20.0]
+    assert batch.to_candles() == plugin.get_candlesticks("BTCUSD", "1m", limit=2)
+
+
+def _ticker(last, open_):
+    return {"a": [str(last + 1), "1", "1"], "b": [str(last - 1), "1", "1"], "c": [str(last), "1"],
+            "h": [str(last), str(last + 5)], "l": [str(open_), str(open_ - 5)], "o": str(open_)}
+
+
+def test_tickers_are_fetched_in_one_request(monkeypatch, fake_session):
+    monkeypatch.setattr(kraken_plugin, "_TICKER_CACHE", TTLCache(ttl=60))
+    plugin = KrakenMarketPlugin()
+    session = fake_session(plugin, {"error": [], "result": {
+        "XXBTZUSD": _ticker(110.0, 100.0),
+        "ETHUSDT": _ticker(22.0, 20.0),
+    }})
+
+    tickers = plugin.get_tickers(["BTCUSD", "ETHUSDT"])
+
+    assert len(session.calls) == 1
+    assert session.calls[0][1] == {"pair": "XBTUSD,ETHUSDT"}
+    assert tickers["BTCUSD"].last == 110.0
+    assert tickers["BTCUSD"].high_24h == 115.0
+    assert tickers["ETHUSDT"].change_24h_pct == 10.0
+    assert plugin.get_ticker("ETHUSDT").inst_id == "ETHUSDT"
+    assert len(session.calls) == 1
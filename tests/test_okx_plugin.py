@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""OKX 插件单元测试（替换 _request，不访问网络）"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.sources import okx_plugin
+from core.plugins.sources._cache import TTLCache
+from core.plugins.sources.okx_plugin import OKXMarketPlugin
+
+
+def _ticker(inst_id, last, open_24h="100"):
+    return {"instId": inst_id, "last": last, "open24h": open_24h, "bidPx": "0", "askPx": "0",
+            "high24h": "0", "low24h": "0", "vol24h": "5"}
+
+
+def _make_plugin(monkeypatch, responses):
+    monkeypatch.setattr(okx_plugin, "_TICKER_CACHE", TTLCache(ttl=60))
+    plugin = OKXMarketPlugin()
+    calls = []
+
+    def fake_request(endpoint, params=None, timeout=30):
+        calls.append((endpoint, dict(params or {})))
+        return responses[endpoint]
+
+    monkeypatch.setattr(plugin, "_request", fake_request)
+    return plugin, calls
+
+
+# 恰好达到批量阈值的一组交易对
+_BASES = ("BTC", "ETH", "SOL", "XRP", "DOGE", "ADA", "TRX", "DOT", "LTC", "LINK")
+assert len(_BASES) == OKXMarketPlugin.BATCH_TICKERS_THRESHOLD
+_SYMBOLS = [f"{base}USDT" for base in _BASES]
+_BATCH_DATA = [_ticker(f"{base}-USDT", "110" if base == "BTC" else "90") for base in _BASES]
+
+
+def test_get_tickers_uses_single_batch_request(monkeypatch):
+    data = _BATCH_DATA + [_ticker("BNB-USDT", "1")]
+    plugin, calls = _make_plugin(monkeypatch, {"/market/tickers": {"code": "0", "data": data}})
+
+    tickers = plugin.get_tickers(_SYMBOLS)
+
+    assert calls == [("/market/tickers", {"instType": "SPOT"})]
+    assert set(tickers) == set(_SYMBOLS)
+    assert tickers["BTCUSDT"].inst_id == "BTCUSDT"
+    assert tickers["BTCUSDT"].change_24h_pct == 10.0
+    assert tickers["ETHUSDT"].last == 90.0
+
+
+def test_get_tickers_below_threshold_requests_each_symbol(monkeypatch):
+    plugin, calls = _make_plugin(monkeypatch, {
+        "/market/tickers": {"code": "0", "data": _BATCH_DATA},
+        "/market/ticker": {"code": "0", "data": [_ticker("BTC-USDT", "110")]},
+    })
+
+    tickers = plugin.get_tickers(_SYMBOLS[:-1])
+
+    assert [endpoint for endpoint, _ in calls] == ["/market/ticker"] * (len(_SYMBOLS) - 1)
+    assert set(tickers) == set(_SYMBOLS[:-1])
+
+
+def test_cached_tickers_are_not_refetched(monkeypatch):
+    plugin, calls = _make_plugin(monkeypatch, {
+        "/market/tickers": {"code": "0", "data": _BATCH_DATA},
+        "/market/ticker": {"code": "0", "data": [_ticker("BTC-USDT", "120")]},
+    })
+
+    plugin.get_tickers(_SYMBOLS)
+    ticker = plugin.get_ticker("BTCUSDT")
+    plugin.get_tickers(_SYMBOLS)
+
+    assert [endpoint for endpoint, _ in calls] == ["/market/tickers"]
+    assert ticker.last == 110.0
+
+
+def test_candlesticks_batch_matches_row_parse(monkeypatch):
+    rows = [
+        ["1600000060000", "2", "4", "1", "3", "10", "30", "30", "1"],
+        ["1600000000000", "1", "2.5", "0.5", "2", "5", "10", "10", "1"],
+    ]
+    plugin, calls = _make_plugin(monkeypatch, {"/market/candles": {"code": "0", "data": rows}})
+
+    batch = plugin.get_candlesticks_batch("BTCUSDT", "1h", limit=2)
+    candles = plugin.get_candlesticks("BTCUSDT", "1h", limit=2)
+
+    assert calls[0] == ("/market/candles", {"instId": "BTC-USDT", "bar": "1H", "limit": "2"})
+    assert list(batch.time) == [1_600_000_000, 1_600_000_060]
+    assert list(batch.close) == [2.0, 3.0]
+    assert batch.to_candles() == candles
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""MarketDataSourcePlugin 基类单元测试"""
+
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.base import (CandleBatch, CandleData, Capability,
+                               DataSourceMetadata, MarketDataSourcePlugin,
+                               SourceType, TickerBatch, TickerData)
+
+
+class SlowTickerPlugin(MarketDataSourcePlugin):
+    MAX_CONCURRENT_REQUESTS = 2
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        super().__init__()
+
+    def _get_metadata(self) -> DataSourceMetadata:
+        return DataSourceMetadata(
+            name="slow",
+            display_name="Slow",
+            description="Dummy",
+            source_type=SourceType.EXCHANGE,
+        )
+
+    def _get_capability(self) -> Capability:
+        return Capability(supports_ticker=True)
+
+    def _get_candlesticks_impl(self, symbol: str, bar: str, limit: int = 100, before: Optional[int] = None, mode: str = "spot"):
+        return []
+
+    def _get_ticker_impl(self, symbol: str, mode: str = "spot") -> TickerData:
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return TickerData(inst_id=symbol, last=float(len(symbol)))
+
+
+def test_get_tickers_fans_out_with_bounded_concurrency():
+    plugin = SlowTickerPlugin()
+    symbols = ["BTCUSDT", "ETHUSDT", "SOLUSDT", "BTCUSDT", "DOGEUSDT"]
+
+    tickers = plugin.get_tickers(symbols)
+
+    assert list(tickers) == ["BTCUSDT", "ETHUSDT", "SOLUSDT", "DOGEUSDT"]
+    assert tickers["DOGEUSDT"].inst_id == "DOGEUSDT"
+    assert tickers["DOGEUSDT"].last == 8.0
+    assert plugin.peak <= SlowTickerPlugin.MAX_CONCURRENT_REQUESTS
+
+
+def test_candle_batch_round_trip():
+    candles = [
+        CandleData(time=60, open=1.0, high=2.0, low=0.5, close=1.5, volume=10.0),
+        CandleData(time=120, open=1.5, high=2.5, low=1.0, close=2.0, volume=5.0),
+    ]
+
+    batch = CandleBatch.from_candles(candles)
+
+    assert len(batch) == 2
+    assert batch.time.typecode == 'q'
+    assert list(batch.close) == [1.5, 2.0]
+    assert batch.to_candles() == candles
+    assert batch.to_dict()['time'] == [60, 120]
+
+
+def test_get_tickers_batch_returns_columns_with_nan_for_missing():
+    plugin = SlowTickerPlugin()
+
+    batch = plugin.get_tickers_batch(["BTCUSDT", "SOLUSDT", "BTCUSDT"])
+
+    assert isinstance(batch, TickerBatch)
+    assert batch.inst_ids == ["BTCUSDT", "SOLUSDT"]
+    assert batch.last.typecode == 'd'
+    assert list(batch.last) == [7.0, 7.0]
+    assert all(math.isnan(v) for v in batch.bid)
+
+
+def test_get_candlesticks_clamps_limit_to_capability():
+    class RecordingPlugin(SlowTickerPlugin):
+        def _get_capability(self) -> Capability:
+            return Capability(supports_candlesticks=True, candlestick_granularities=["1m"], candlestick_limit=50)
+
+        def _get_candlesticks_impl(self, symbol, bar, limit=100, before=None, mode="spot"):
+            self.seen_limit = limit
+            return []
+
+    plugin = RecordingPlugin()
+    plugin.get_candlesticks("BTCUSDT", "1m", limit=500)
+    assert plugin.seen_limit == 50
+    plugin.get_candlesticks("BTCUSDT", "1m", limit=0)
+    assert plugin.seen_limit == 1
+
+
+def test_aget_tickers_runs_fan_out_off_the_event_loop():
+    plugin = SlowTickerPlugin()
+
+    tickers = asyncio.run(plugin.aget_tickers(["BTCUSDT", "ETHUSDT"]))
+
+    assert list(tickers) == ["BTCUSDT", "ETHUSDT"]
+    assert tickers["ETHUSDT"].last == 7.0
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""PluginManager unit tests"""
+
+import dataclasses
+import json
+import os
+import sys
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.plugins.base import (Capability, DataSourceMetadata,
+                               MarketDataSourcePlugin, SourceType, TickerData)
+from core.plugins.documentation import DocumentationGenerator
+from core.plugins.manager import PluginManager
+
+
+class CountingPlugin(MarketDataSourcePlugin):
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+        super().__init__()
+
+    def _get_metadata(self) -> DataSourceMetadata:
+        return DataSourceMetadata(
+            name="counting",
+            display_name="Counting",
+            description="Dummy",
+            source_type=SourceType.EXCHANGE,
+        )
+
+    def _get_capability(self) -> Capability:
+        return Capability(
+            supports_candlesticks=True,
+            candlestick_granularities=["1m", "1h"],
+            supports_ticker=True,
+        )
+
+    def _get_candlesticks_impl(self, symbol: str, bar: str, limit: int = 100, before: Optional[int] = None, mode: str = "spot"):
+        return []
+
+    def _get_ticker_impl(self, symbol: str, mode: str = "spot") -> TickerData:
+        raise NotImplementedError
+
+
+def test_capability_lookup_does_not_instantiate_lazy_plugin():
+    CountingPlugin.instances = 0
+    manager = PluginManager()
+    manager.register_plugin_class(CountingPlugin, auto_instantiate=False)
+    assert CountingPlugin.instances == 1  # 注册时获取名称
+
+    capability = manager.get_plugin_capability("counting")
+    assert capability is not None
+    assert capability.candlestick_granularities == ["1m", "1h"]
+    assert manager.get_all_metadata()["counting"].display_name == "Counting"
+
+    table = DocumentationGenerator._generate_comparison_table(manager)
+    assert "| Counting | ✅ | ✅ | 2 |" in table
+    assert CountingPlugin.instances == 1
+
+    assert manager.get_plugin("counting") is not None
+    assert CountingPlugin.instances == 2
+
+
+def test_shared_capability_is_immutable():
+    capability = Capability(symbol_modes=["SPOT", "contract", "spot"])
+    assert capability.symbol_modes == ("spot", "contract")
+    assert Capability(symbol_modes=[]).symbol_modes == ("spot",)
+
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        capability.symbol_modes = ("spot",)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        CountingPlugin().get_metadata().display_name = "Changed"
+
+
+def test_unregister_drops_descriptors():
+    manager = PluginManager()
+    manager.register_plugin(CountingPlugin())
+    manager.unregister_plugin("counting")
+
+    assert manager.get_plugin_capability("counting") is None
+    assert manager.get_all_metadata() == {}
+
+
+class PricedPlugin(CountingPlugin):
+    def __init__(self, name, price):
+        self._name = name
+        self._price = price
+        super().__init__()
+
+    def _get_metadata(self) -> DataSourceMetadata:
+        return DataSourceMetadata(
+            name=self._name,
+            display_name=self._name,
+            description="Dummy",
+            source_type=SourceType.EXCHANGE,
+        )
+
+    def _get_ticker_impl(self, symbol: str, mode: str = "spot") -> TickerData:
+        if self._price is None:
+            raise RuntimeError("boom")
+        return TickerData(inst_id=symbol, last=self._price)
+
+
+def test_get_ticker_from_sources_skips_failed_sources():
+    manager = PluginManager()
+    for name, price in (("a", 1.0), ("broken", None), ("b", 2.0)):
+        manager.register_plugin(PricedPlugin(name, price))
+
+    tickers = manager.get_ticker_from_sources("BTCUSDT")
+
+    assert list(tickers) == ["a", "b"]
+    assert tickers["b"].last == 2.0
+    assert tickers["b"].inst_id == "BTCUSDT"
+
+
+def test_capabilities_bytes_match_dict_export():
+    manager = PluginManager()
+    manager.register_plugin(CountingPlugin())
+
+    exported = json.loads(DocumentationGenerator.generate_capabilities_json_bytes(manager))
+    expected = DocumentationGenerator.generate_capabilities_json(manager)
+
+    assert exported["plugins"] == expected["plugins"]
@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'geneticgrid.settings')
 django.setup()
 
-from core.plugins.manager import PluginManager
+from core.plugins.manager import get_plugin_manager
 from core.plugins.base import PluginError
 from core.proxy_config import is_proxy_available
 
@@ -33,7 +33,7 @@ def test_plugin_network():
     print(f"  SOCKS5 (127.0.0.1:1080): {'✅ 可用' if socks5_available else '❌ 不可用'}")
     print(f"  HTTP (127.0.0.1:8080): {'✅ 可用' if http_available else '❌ 不可用'}\n")
     
-    manager = PluginManager()
+    manager = get_plugin_manager()
     all_plugins = manager.get_all_plugins()
     
     results = {
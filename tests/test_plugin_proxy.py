@@ -15,7 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'geneticgrid.settings')
 django.setup()
 
-from core.plugins.manager import PluginManager
+from core.plugins.manager import get_plugin_manager
 
 
 def test_plugin_proxy_config():
@@ -24,7 +24,7 @@ def test_plugin_proxy_config():
     print("📋 插件代理配置测试")
     print("="*60 + "\n")
     
-    manager = PluginManager()
+    manager = get_plugin_manager()
     
     # 检查每个插件的代理配置
     print("🔍 检查各插件代理配置:\n")
@@ -11,12 +11,12 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'geneticgrid.settings')
 django.setup()
 
-from core.plugins.manager import PluginManager
+from core.plugins.manager import get_plugin_manager
 
 
 def main():
     # 获取插件管理器实例
-    manager = PluginManager()
+    manager = get_plugin_manager()
     
     # 获取所有插件
     plugins = manager.get_all_plugins()